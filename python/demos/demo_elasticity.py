@@ -5,6 +5,8 @@
 # SPDX-License-Identifier:    MIT
 
 
+from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser
+
 import dolfinx.fem as fem
 import dolfinx_mpc.utils
 import numpy as np
@@ -13,14 +15,14 @@ import scipy.sparse.linalg
 from dolfinx.common import Timer
 from dolfinx.io import XDMFFile
 from dolfinx.mesh import create_unit_square, locate_entities_boundary
-from dolfinx_mpc import (MultiPointConstraint, LinearProblem)
+from dolfinx_mpc import (Constraint, MultiPointConstraint, LinearProblem)
 from mpi4py import MPI
 from petsc4py import PETSc
 from ufl import (Identity, SpatialCoordinate, TestFunction, TrialFunction,
                  as_vector, dx, grad, inner, sym, tr)
 
 
-def demo_elasticity():
+def demo_elasticity(compare: bool = False, unconstrained: bool = False):
     mesh = create_unit_square(MPI.COMM_WORLD, 10, 10)
 
     V = fem.VectorFunctionSpace(mesh, ("Lagrange", 1))
@@ -56,12 +58,14 @@ def demo_elasticity():
     a = inner(sigma(u), grad(v)) * dx
     rhs = inner(as_vector((0, (x[0] - 0.5) * 10**4 * x[1])), v) * dx
 
-    # Create MPC
-    def l2b(li):
-        return np.array(li, dtype=np.float64).tobytes()
-    s_m_c = {l2b([1, 0]): {l2b([1, 1]): 0.9}}
+    # Create MPC: u_y(1, 0) = 0.9 u_y(1, 1)
+    constraint = Constraint(slave_coords=np.array([[1, 0]], dtype=np.float64),
+                            master_coords=np.array([[1, 1]], dtype=np.float64),
+                            coeffs=np.array([0.9], dtype=PETSc.ScalarType),
+                            offsets=np.array([0, 1], dtype=np.int32),
+                            subspace_slave=1, subspace_master=1)
     mpc = MultiPointConstraint(V)
-    mpc.create_general_constraint(s_m_c, 1, 1)
+    mpc.create_array_constraint(constraint)
     mpc.finalize()
 
     # Solve Linear problem
@@ -73,89 +77,97 @@ def demo_elasticity():
         outfile.write_mesh(mesh)
         outfile.write_function(u_h)
 
+    # Assemble the unconstrained system, used as reference
+    if compare or unconstrained:
+        bilinear_form = fem.form(a)
+        A_org = fem.petsc.assemble_matrix(bilinear_form, bcs)
+        A_org.assemble()
+        linear_form = fem.form(rhs)
+        L_org = fem.petsc.assemble_vector(linear_form)
+        fem.petsc.apply_lifting(L_org, [bilinear_form], [bcs])
+        L_org.ghostUpdate(addv=PETSc.InsertMode.ADD_VALUES, mode=PETSc.ScatterMode.REVERSE)
+        fem.petsc.set_bc(L_org, bcs)
+
+    # Solve the unconstrained problem for comparison
+    if unconstrained:
+        solver = PETSc.KSP().create(MPI.COMM_WORLD)
+        solver.setType(PETSc.KSP.Type.PREONLY)
+        solver.getPC().setType(PETSc.PC.Type.LU)
+        solver.setOperators(A_org)
+        u_ = fem.Function(V)
+        solver.solve(L_org, u_.vector)
+        u_.x.scatter_forward()
+        u_.name = "u_unconstrained"
+
+        with XDMFFile(MPI.COMM_WORLD, "results/demo_elasticity.xdmf", "a") as outfile:
+            outfile.write_function(u_)
+            outfile.close()
+
     # Solve the MPC problem using a global transformation matrix
     # and numpy solvers to get reference values
-    bilinear_form = fem.form(a)
-    A_org = fem.petsc.assemble_matrix(bilinear_form, bcs)
-    A_org.assemble()
-    linear_form = fem.form(rhs)
-    L_org = fem.petsc.assemble_vector(linear_form)
-    fem.petsc.apply_lifting(L_org, [bilinear_form], [bcs])
-    L_org.ghostUpdate(addv=PETSc.InsertMode.ADD_VALUES, mode=PETSc.ScatterMode.REVERSE)
-    fem.petsc.set_bc(L_org, bcs)
-    solver = PETSc.KSP().create(MPI.COMM_WORLD)
-    solver.setType(PETSc.KSP.Type.PREONLY)
-    solver.getPC().setType(PETSc.PC.Type.LU)
-    solver.setOperators(A_org)
-    u_ = fem.Function(V)
-    solver.solve(L_org, u_.vector)
-    u_.x.scatter_forward()
-    u_.name = "u_unconstrained"
-
-    with XDMFFile(MPI.COMM_WORLD, "results/demo_elasticity.xdmf", "a") as outfile:
-        outfile.write_function(u_)
-        outfile.close()
-
-    root = 0
-    with Timer("~Demo: Verification"):
-        dolfinx_mpc.utils.compare_mpc_lhs(A_org, problem.A, mpc, root=root)
-        dolfinx_mpc.utils.compare_mpc_rhs(L_org, problem.b, mpc, root=root)
-
-        # Gather LHS, RHS and solution on one process
-        A_csr = dolfinx_mpc.utils.gather_PETScMatrix(A_org, root=root)
-        K = dolfinx_mpc.utils.gather_transformation_matrix(mpc, root=root)
-        L_np = dolfinx_mpc.utils.gather_PETScVector(L_org, root=root)
-        u_mpc = dolfinx_mpc.utils.gather_PETScVector(u_h.vector, root=root)
-
-        if MPI.COMM_WORLD.rank == root:
-            KTAK = K.T * A_csr * K
-            reduced_L = K.T @ L_np
-            # Solve linear system
-            d = scipy.sparse.linalg.spsolve(KTAK, reduced_L)
-            # Back substitution to full solution vector
-            uh_numpy = K @ d
-            assert np.allclose(uh_numpy, u_mpc)
+    if compare:
+        root = 0
+        with Timer("~Demo: Verification"):
+            dolfinx_mpc.utils.compare_mpc_lhs(A_org, problem.A, mpc, root=root)
+            dolfinx_mpc.utils.compare_mpc_rhs(L_org, problem.b, mpc, root=root)
+
+            # Gather LHS, RHS and solution on one process
+            A_csr = dolfinx_mpc.utils.gather_PETScMatrix(A_org, root=root)
+            K = dolfinx_mpc.utils.gather_transformation_matrix(mpc, root=root)
+            L_np = dolfinx_mpc.utils.gather_PETScVector(L_org, root=root)
+            u_mpc = dolfinx_mpc.utils.gather_PETScVector(u_h.vector, root=root)
+
+            if MPI.COMM_WORLD.rank == root:
+                KTAK = K.T * A_csr * K
+                reduced_L = K.T @ L_np
+                # Solve linear system
+                d = scipy.sparse.linalg.spsolve(KTAK, reduced_L)
+                # Back substitution to full solution vector
+                uh_numpy = K @ d
+                assert np.allclose(uh_numpy, u_mpc)
 
     # Print out master-slave connectivity for the first slave
     master_owner = None
     master_data = None
     slave_owner = None
+    send_request = None
+    index_map = mpc.function_space.dofmap.index_map
+    bs = mpc.function_space.dofmap.index_map_bs
     if mpc.num_local_slaves > 0:
         slave_owner = MPI.COMM_WORLD.rank
-        bs = mpc.function_space.dofmap.index_map_bs
         slave = mpc.slaves[0]
-        print("Constrained: {0:.5e}\n Unconstrained: {1:.5e}"
-              .format(u_h.x.array[slave], u_.vector.array[slave]))
+        print("Constrained: {0:.5e}".format(u_h.x.array[slave]))
+        if unconstrained:
+            print(" Unconstrained: {0:.5e}".format(u_.vector.array[slave]))
         master_owner = mpc._cpp_object.owners.links(slave)[0]
-        _masters = mpc.masters
-        master = _masters.links(slave)[0]
-        glob_master = mpc.function_space.dofmap.index_map.local_to_global([master // bs])[0]
+        master = mpc.masters.links(slave)[0]
+        glob_master = index_map.local_to_global([master // bs])[0]
         coeffs, offs = mpc.coefficients()
-        master_data = [glob_master * bs + master % bs,
-                       coeffs[offs[slave]:offs[slave + 1]][0]]
+        coeff = coeffs[offs[slave]]
+        master_data = [glob_master * bs + master % bs, coeff]
         # If master not on proc send info to this processor
         if MPI.COMM_WORLD.rank != master_owner:
-            MPI.COMM_WORLD.send(master_data, dest=master_owner, tag=1)
+            send_request = MPI.COMM_WORLD.isend(master_data, dest=master_owner, tag=1)
         else:
-            print("Master*Coeff: {0:.5e}".format(coeffs[offs[slave]:offs[slave + 1]][0]
-                                                 * u_h.x.array[_masters.links(slave)[0]]))
+            print("Master*Coeff: {0:.5e}".format(coeff * u_h.x.array[master]))
     # As a processor with a master is not aware that it has a master,
     # Determine this so that it can receive the global dof and coefficient
-    master_recv = MPI.COMM_WORLD.allgather(master_owner)
-    for master in master_recv:
-        if master is not None:
-            master_owner = master
-            break
+    master_owner = MPI.COMM_WORLD.allreduce(-1 if master_owner is None else master_owner, op=MPI.MAX)
     if slave_owner != master_owner and MPI.COMM_WORLD.rank == master_owner:
-        dofmap = mpc.function_space.dofmap
-        bs = dofmap.index_map_bs
         in_data = MPI.COMM_WORLD.recv(source=MPI.ANY_SOURCE, tag=1)
-        num_local = dofmap.index_map.size_local + dofmap.index_map.num_ghosts
-        l2g = dofmap.index_map.local_to_global(np.arange(num_local, dtype=np.int32))
-        l_index = np.flatnonzero(l2g == in_data[0] // bs)[0]
+        # The master is owned by this process, so its local index follows from the owned range
+        l_index = in_data[0] // bs - index_map.local_range[0]
         print("Master*Coeff (on other proc): {0:.5e}"
               .format(u_h.x.array[l_index * bs + in_data[0] % bs] * in_data[1]))
+    if send_request is not None:
+        send_request.wait()
 
 
 if __name__ == "__main__":
-    demo_elasticity()
+    parser = ArgumentParser(formatter_class=ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--compare', dest='compare', action='store_true',
+                        help="Compare with global solution", default=False)
+    parser.add_argument('--unconstrained', dest='unconstrained', action='store_true',
+                        help="Solve the unconstrained problem for comparison", default=False)
+    args = parser.parse_args()
+    demo_elasticity(compare=args.compare, unconstrained=args.unconstrained)
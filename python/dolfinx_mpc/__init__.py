@@ -11,9 +11,10 @@ import dolfinx_mpc.cpp
 
 # New local assemblies
 from .assemble_matrix import assemble_matrix, create_matrix_nest, \
-    assemble_matrix_nest, create_sparsity_pattern
+    assemble_matrix_nest, create_sparsity_pattern, create_matrix
 from .assemble_vector import assemble_vector, apply_lifting, \
     assemble_vector_nest, create_vector_nest
+from .dictcondition import Constraint
 from .multipointconstraint import MultiPointConstraint
 from .problem import LinearProblem
 
@@ -21,4 +22,4 @@ from .problem import LinearProblem
 __all__ = ["assemble_matrix", "create_matrix_nest", "assemble_matrix_nest",
            "assemble_vector", "apply_lifting", "assemble_vector_nest", 
            "create_vector_nest", "MultiPointConstraint", "LinearProblem",
-           "create_sparsity_pattern"]
\ No newline at end of file
+           "create_sparsity_pattern", "create_matrix", "Constraint"]
\ No newline at end of file
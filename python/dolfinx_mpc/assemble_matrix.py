@@ -20,7 +20,8 @@ def assemble_matrix(form: _fem.FormMetaClass,
                                       Sequence[MultiPointConstraint]],
                     bcs: Sequence[_fem.DirichletBCMetaClass] = [],
                     diagval: _PETSc.ScalarType = 1,
-                    A: Optional[_PETSc.Mat] = None) -> _PETSc.Mat:
+                    A: Optional[_PETSc.Mat] = None,
+                    reuse_sparsity: bool = False) -> _PETSc.Mat:
     """
     Assemble a compiled DOLFINx bilinear form into a PETSc matrix with corresponding multi point constraints
     and Dirichlet boundary conditions.
@@ -31,6 +32,10 @@ def assemble_matrix(form: _fem.FormMetaClass,
         bcs: Sequence of Dirichlet boundary conditions
         diagval: Value to set on the diagonal of the matrix
         A: PETSc matrix to assemble into
+        reuse_sparsity: If `A` is not supplied, cache the sparsity pattern of the form on the
+            constraint, and reuse it when creating the matrix in subsequent calls. Each cached
+            pattern keeps its form and constraints alive until
+            :func:`dolfinx_mpc.MultiPointConstraint.clear_sparsity_patterns` is called
 
     Returns:
         _PETSc.Mat: The matrix with the assembled bi-linear form
@@ -41,8 +46,7 @@ def assemble_matrix(form: _fem.FormMetaClass,
 
     # Generate matrix with MPC sparsity pattern
     if A is None:
-        A = cpp.mpc.create_matrix(form, constraint[0]._cpp_object,
-                                  constraint[1]._cpp_object)
+        A = create_matrix(form, constraint, reuse_sparsity)
     A.zeroEntries()
 
     # Assemble matrix in C++
@@ -59,6 +63,36 @@ def assemble_matrix(form: _fem.FormMetaClass,
     return A
 
 
+def create_matrix(form: _fem.FormMetaClass, constraint: Sequence[MultiPointConstraint],
+                  reuse_sparsity: bool = False, mat_type: str = "") -> _PETSc.Mat:
+    """
+    Create a PETSc matrix with the sparsity pattern of a compiled DOLFINx form and the
+    multi point constraints for its rows and columns.
+
+    Args:
+        form: The compiled bilinear variational form
+        constraint: The multi point constraints on axis 0 & 1, respectively
+        reuse_sparsity: Cache the sparsity pattern on the first constraint, and reuse it for
+            subsequent calls with the same form and constraints. Each cached pattern keeps its
+            form and constraints alive until
+            :func:`dolfinx_mpc.MultiPointConstraint.clear_sparsity_patterns` is called
+        mat_type: The PETSc matrix type, e.g. `"baij"` to store the matrix in blocks of the
+            function space block size. An empty string uses the default type of the C++ matrix
+            creation.
+    """
+    if not reuse_sparsity:
+        return cpp.mpc.create_matrix(form, constraint[0]._cpp_object, constraint[1]._cpp_object, mat_type)
+
+    # The form and constraint are stored with the pattern to keep their ids valid
+    key = (id(form), id(constraint[1]))
+    patterns = constraint[0]._sparsity_patterns
+    if key not in patterns:
+        pattern = cpp.mpc.create_sparsity_pattern(form, constraint[0]._cpp_object, constraint[1]._cpp_object)
+        pattern.assemble()
+        patterns[key] = (form, constraint[1], pattern)
+    return _cpp.la.petsc.create_matrix(constraint[0].function_space.mesh.comm, patterns[key][2], mat_type)
+
+
 def create_sparsity_pattern(form: _fem.FormMetaClass,
                             mpc: Union[MultiPointConstraint,
                                        Sequence[MultiPointConstraint]]):
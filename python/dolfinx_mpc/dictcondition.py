@@ -23,6 +23,113 @@ def close_to(point: np.typing.NDArray[np.float64]):
     return lambda x: np.isclose(x, point).all(axis=0)
 
 
+def _locate_dofs_at_points(V: fem.FunctionSpace, subspace: typing.Optional[int],
+                           points: np.typing.NDArray[np.float64]) -> typing.List[np.typing.NDArray[np.int32]]:
+    """
+    Locate the degrees of freedom (local to process) whose coordinates are close to each
+    of the input points, using the same tolerance as :func:`close_to`.
+    The dof coordinates are tabulated (and the sub space collapsed) once, and sorted into bins
+    of a uniform grid whose spacing is the largest tolerance. Each point is then only compared
+    with the dofs in its own and neighbouring bins.
+
+    Args:
+        V: The function space
+        subspace: If not `None`, only locate dofs in this sub space of `V`
+        points: The points, shape `(num_points, 3)`
+
+    Returns:
+        For each point the dofs close to it. If a sub space is supplied, the dofs are
+        given in the numbering of the parent space.
+    """
+    if subspace is None:
+        x = V.tabulate_dof_coordinates()
+        dofs = np.arange(x.shape[0], dtype=np.int32)
+    else:
+        Vsub, parent_dofs = V.sub(subspace).collapse()
+        x = np.repeat(Vsub.tabulate_dof_coordinates(), Vsub.dofmap.index_map_bs, axis=0)
+        dofs = np.asarray(parent_dofs, dtype=np.int32)
+    if len(points) == 0 or len(x) == 0:
+        return [np.zeros(0, dtype=np.int32) for _ in range(len(points))]
+
+    # Sort the dofs lexicographically by their bin, such that each bin is a contiguous slice
+    h = np.max(1e-8 + 1e-5 * np.abs(points))
+    keys = np.floor(x / h).astype(np.int64)
+    order = np.lexsort(keys.T[::-1])
+    bins, start, count = np.unique(keys[order], axis=0, return_index=True, return_counts=True)
+    bin_to_dofs = {tuple(b): order[s:s + c] for b, s, c in zip(bins, start, count)}
+
+    neighbours = np.array(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1])).reshape(3, -1).T
+    point_keys = np.floor(points / h).astype(np.int64)
+    empty = np.zeros(0, dtype=order.dtype)
+    located = []
+    for point, key in zip(points, point_keys):
+        candidates = np.hstack([bin_to_dofs.get(tuple(b), empty) for b in key + neighbours])
+        is_close = np.isclose(x[candidates], point).all(axis=1)
+        located.append(dofs[candidates[is_close]])
+    return located
+
+
+def _pad_points(points: np.typing.ArrayLike) -> np.typing.NDArray[np.float64]:
+    """
+    Pad a set of points `(num_points, gdim)` to 3D
+    """
+    points = np.asarray(points, dtype=np.float64)
+    points = points.reshape(len(points), -1)
+    if points.shape[1] > 3:
+        raise ValueError(f"Points should have at most 3 coordinates, got {points.shape[1]}")
+    padded = np.zeros((points.shape[0], 3), dtype=np.float64)
+    padded[:, :points.shape[1]] = points
+    return padded
+
+
+class Constraint():
+    """
+    A general constraint where the slave and master degrees of freedom are given by their
+    coordinates, stored as flat arrays.
+
+    Args:
+        slave_coords: The coordinates of the slave dofs, shape `(num_slaves, gdim)`
+        master_coords: The coordinates of the master dofs, shape `(num_masters, gdim)`
+        coeffs: The coefficient for each master
+        offsets: Array indicating the location in the master arrays for the i-th slave, i.e.
+            the masters of the i-th slave are located at `master_coords[offsets[i]:offsets[i+1]]`
+        subspace_slave: If using mixed or vector space, and only want to use dofs from
+            a sub space as slave add index here.
+        subspace_master: Subspace index for mixed or vector spaces
+
+    Examples:
+        If the dof `D` located at `[d0,d1]` should be constrained to the dofs `E` and
+        F at `[e0,e1]` and `[f0,f1]` as :math:`D = \\alpha E + \\beta F`, the constraint is:
+
+        .. highlight:: python
+        .. code-block:: python
+
+            Constraint(numpy.array([[d0, d1]]), numpy.array([[e0, e1], [f0, f1]]),
+                       numpy.array([alpha, beta]), numpy.array([0, 2]))
+    """
+    slave_coords: np.typing.NDArray[np.float64]
+    master_coords: np.typing.NDArray[np.float64]
+    coeffs: np.typing.NDArray[PETSc.ScalarType]
+    offsets: np.typing.NDArray[np.int32]
+    subspace_slave: typing.Optional[int]
+    subspace_master: typing.Optional[int]
+    __slots__ = tuple(__annotations__)
+
+    def __init__(self, slave_coords: np.typing.ArrayLike, master_coords: np.typing.ArrayLike,
+                 coeffs: np.typing.ArrayLike, offsets: np.typing.ArrayLike,
+                 subspace_slave: typing.Optional[int] = None, subspace_master: typing.Optional[int] = None):
+        self.slave_coords = _pad_points(slave_coords)
+        self.master_coords = _pad_points(master_coords)
+        self.coeffs = np.asarray(coeffs, dtype=PETSc.ScalarType)
+        self.offsets = np.asarray(offsets, dtype=np.int32)
+        self.subspace_slave = subspace_slave
+        self.subspace_master = subspace_master
+        if len(self.offsets) != len(self.slave_coords) + 1:
+            raise ValueError("The offsets should have length num_slaves + 1")
+        if not (self.offsets[-1] == len(self.master_coords) == len(self.coeffs)):
+            raise ValueError("The number of master coordinates and coefficients should be equal to offsets[-1]")
+
+
 @typing.no_type_check
 def create_dictionary_constraint(V: fem.FunctionSpace, slave_master_dict:
                                  typing.Dict[bytes, typing.Dict[bytes, float]],
@@ -51,32 +158,67 @@ def create_dictionary_constraint(V: fem.FunctionSpace, slave_master_dict:
                 numpy.array([f0, f1], dtype=numpy.float64).tobytes(): beta}}
     """
     dfloat = np.float64
+    slave_coords = np.zeros((len(slave_master_dict), 3), dtype=dfloat)
+    master_coords, coeffs, offsets = [], [], [0]
+    for i, (slave_point, masters) in enumerate(slave_master_dict.items()):
+        sp = np.frombuffer(slave_point, dtype=dfloat)
+        slave_coords[i, :len(sp)] = sp
+        for master_point, coeff in masters.items():
+            master_coords.append(_pad_points(np.frombuffer(master_point, dtype=dfloat).reshape(1, -1))[0])
+            coeffs.append(coeff)
+        offsets.append(len(coeffs))
+    constraint = Constraint(slave_coords, np.asarray(master_coords, dtype=dfloat).reshape(-1, 3),
+                            coeffs, offsets, subspace_slave, subspace_master)
+    return create_array_constraint(V, constraint)
+
+
+@typing.no_type_check
+def create_array_constraint(V: fem.FunctionSpace, constraint: Constraint):
+    """
+    Returns a multi point constraint for a given function space, where the slave and master
+    degrees of freedom are given by their coordinates.
+
+    Args:
+        V: The function space
+        constraint: The slave and master coordinates, coefficients and sub spaces
+    """
     comm = V.mesh.comm
     bs = V.dofmap.index_map_bs
     local_size = V.dofmap.index_map.size_local * bs
     index_map = V.dofmap.index_map
+    slave_points = constraint.slave_coords
+    master_points = constraint.master_coords
+    coeffs = constraint.coeffs
+    offsets = constraint.offsets
+    subspace_slave = constraint.subspace_slave
+    subspace_master = constraint.subspace_master
+
+    # Locate all slaves and masters on process
+    located_slaves = _locate_dofs_at_points(V, subspace_slave, slave_points)
+    located_masters = _locate_dofs_at_points(V, subspace_master, master_points)
+
+    # Only add masters owned by this processor, and map them to the global numbering
+    master_dofs = np.full(len(master_points), -1, dtype=np.int32)
+    for j, dofs in enumerate(located_masters):
+        owned_dofs = dofs[dofs < local_size]
+        if len(owned_dofs) == 1:
+            master_dofs[j] = owned_dofs[0]
+        elif len(owned_dofs) > 1:
+            raise RuntimeError("Multiple masters found at same point. You should use sub-space locators.")
+    has_master = master_dofs > -1
+    global_masters = np.full(len(master_points), -1, dtype=np.int64)
+    global_masters[has_master] = (index_map.local_to_global(master_dofs[has_master] // bs) * bs
+                                  + master_dofs[has_master] % bs)
+
     owned_entities = {}
     ghosted_entities = {}
     non_local_entities = {}
     slaves_local = {}
     slaves_ghost = {}
-    slave_point_nd = np.zeros((3, 1), dtype=dfloat)
-    for i, slave_point in enumerate(slave_master_dict.keys()):
-        num_masters = len(list(slave_master_dict[slave_point].keys()))
+    for i, slave_dofs in enumerate(located_slaves):
+        num_masters = offsets[i + 1] - offsets[i]
         # Status for current slave, -1 if not on proc, 0 if ghost, 1 if owned
         slave_status = -1
-        # Wrap slave point as numpy array
-        sp = np.frombuffer(slave_point, dtype=dfloat)
-        for j, coord in enumerate(sp):
-            slave_point_nd[j] = coord
-        slave_point_nd[len(sp):] = 0
-
-        if subspace_slave is None:
-            slave_dofs = fem.locate_dofs_geometrical(V, close_to(slave_point_nd))
-        else:
-            Vsub = V.sub(subspace_slave).collapse()[0]
-            slave_dofs = fem.locate_dofs_geometrical(
-                (V.sub(subspace_slave), Vsub), close_to(slave_point_nd))[0]
         if len(slave_dofs) == 1:
             # Decide if slave is ghost or not
             if slave_dofs[0] < local_size:
@@ -96,50 +238,33 @@ def create_dictionary_constraint(V: fem.FunctionSpace, slave_master_dict:
         elif len(slave_dofs) > 1:
             raise RuntimeError("Multiple slaves found at same point. "
                                + "You should use sub-space locators.")
-        # Wrap as list to ensure order later
-        master_points = list(slave_master_dict[slave_point].keys())
-        master_points_nd = np.zeros((3, len(master_points)), dtype=dfloat)
-        for (j, master_point) in enumerate(master_points):
-            # Wrap bytes as numpy array
-            for k, coord in enumerate(np.frombuffer(master_point, dtype=dfloat)):
-                master_points_nd[k, j] = coord
-            if subspace_master is None:
-                master_dofs = fem.locate_dofs_geometrical(V, close_to(master_points_nd[:, j:j + 1]))
-            else:
-                Vsub = V.sub(subspace_master).collapse()[0]
-                master_dofs = fem.locate_dofs_geometrical((V.sub(subspace_master), Vsub),
-                                                          close_to(master_points_nd[:, j:j + 1]))[0]
-
-            # Only add masters owned by this processor
-            master_dofs = master_dofs[master_dofs < local_size]
-            if len(master_dofs) == 1:
-                master_block = master_dofs[0] // bs
-                master_rem = master_dofs % bs
-                glob_master = index_map.local_to_global([master_block])[0]
-                if slave_status == -1:
-                    if i in non_local_entities.keys():
-                        non_local_entities[i]["masters"].append(glob_master * bs + master_rem)
-                        non_local_entities[i]["coeffs"].append(slave_master_dict[slave_point][master_point])
-                        non_local_entities[i]["owners"].append(comm.rank),
-                        non_local_entities[i]["local_index"].append(j)
-                    else:
-                        non_local_entities[i] = {"masters": [glob_master * bs + master_rem],
-                                                 "coeffs": [slave_master_dict[slave_point][master_point]],
-                                                 "owners": [comm.rank], "local_index": [j]}
-                elif slave_status == 0:
-                    ghosted_entities[i]["masters"][j] = glob_master * bs + master_rem
-                    ghosted_entities[i]["owners"][j] = comm.rank
-                    ghosted_entities[i]["coeffs"][j] = slave_master_dict[slave_point][master_point]
-                    ghosted_entities[i]["local_index"].append(j)
-                elif slave_status == 1:
-                    owned_entities[i]["masters"][j] = glob_master * bs + master_rem
-                    owned_entities[i]["owners"][j] = comm.rank
-                    owned_entities[i]["coeffs"][j] = slave_master_dict[slave_point][master_point]
-                    owned_entities[i]["local_index"].append(j)
+        for j in range(num_masters):
+            if not has_master[offsets[i] + j]:
+                continue
+            glob_master = global_masters[offsets[i] + j]
+            coeff = coeffs[offsets[i] + j]
+            if slave_status == -1:
+                if i in non_local_entities.keys():
+                    non_local_entities[i]["masters"].append(glob_master)
+                    non_local_entities[i]["coeffs"].append(coeff)
+                    non_local_entities[i]["owners"].append(comm.rank),
+                    non_local_entities[i]["local_index"].append(j)
                 else:
-                    raise RuntimeError("Invalid slave status: {0:d} (-1,0,1 are valid options)".format(slave_status))
-            elif len(master_dofs) > 1:
-                raise RuntimeError("Multiple masters found at same point. You should use sub-space locators.")
+                    non_local_entities[i] = {"masters": [glob_master],
+                                             "coeffs": [coeff],
+                                             "owners": [comm.rank], "local_index": [j]}
+            elif slave_status == 0:
+                ghosted_entities[i]["masters"][j] = glob_master
+                ghosted_entities[i]["owners"][j] = comm.rank
+                ghosted_entities[i]["coeffs"][j] = coeff
+                ghosted_entities[i]["local_index"].append(j)
+            elif slave_status == 1:
+                owned_entities[i]["masters"][j] = glob_master
+                owned_entities[i]["owners"][j] = comm.rank
+                owned_entities[i]["coeffs"][j] = coeff
+                owned_entities[i]["local_index"].append(j)
+            else:
+                raise RuntimeError("Invalid slave status: {0:d} (-1,0,1 are valid options)".format(slave_status))
 
     # Send the ghost and owned entities to processor 0 to gather them
     data_to_send = [owned_entities, ghosted_entities, non_local_entities]
@@ -222,14 +222,16 @@ void mpc(py::module& m)
       "create_matrix",
       [](const dolfinx::fem::Form<PetscScalar>& a,
          const std::shared_ptr<dolfinx_mpc::MultiPointConstraint<PetscScalar>>&
-             mpc)
+             mpc,
+         const std::string& mat_type)
       {
-        auto A = dolfinx_mpc::create_matrix(a, mpc);
+        auto A = dolfinx_mpc::create_matrix(a, mpc, mat_type);
         Mat _A = A.mat();
         PetscObjectReference((PetscObject)_A);
         return _A;
       },
-      py::return_value_policy::take_ownership,
+      py::return_value_policy::take_ownership, py::arg("a"), py::arg("mpc"),
+      py::arg("mat_type") = std::string(),
       "Create a PETSc Mat for bilinear form.");
   m.def(
       "create_matrix",
@@ -237,14 +239,16 @@ void mpc(py::module& m)
          const std::shared_ptr<dolfinx_mpc::MultiPointConstraint<PetscScalar>>&
              mpc0,
          const std::shared_ptr<dolfinx_mpc::MultiPointConstraint<PetscScalar>>&
-             mpc1)
+             mpc1,
+         const std::string& mat_type)
       {
-        auto A = dolfinx_mpc::create_matrix(a, mpc0, mpc1);
+        auto A = dolfinx_mpc::create_matrix(a, mpc0, mpc1, mat_type);
         Mat _A = A.mat();
         PetscObjectReference((PetscObject)_A);
         return _A;
       },
-      py::return_value_policy::take_ownership,
+      py::return_value_policy::take_ownership, py::arg("a"), py::arg("mpc0"),
+      py::arg("mpc1"), py::arg("mat_type") = std::string(),
       "Create a PETSc Mat for bilinear form.");
   m.def("create_contact_slip_condition",
         &dolfinx_mpc::create_contact_slip_condition);
@@ -4,7 +4,7 @@
 #
 # SPDX-License-Identifier:    MIT
 
-from typing import Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import dolfinx.cpp as _cpp
 import dolfinx.fem as _fem
@@ -14,7 +14,7 @@ from petsc4py import PETSc as _PETSc
 
 import dolfinx_mpc.cpp
 
-from .dictcondition import create_dictionary_constraint
+from .dictcondition import Constraint, create_array_constraint, create_dictionary_constraint
 
 
 class MultiPointConstraint():
@@ -33,6 +33,7 @@ class MultiPointConstraint():
     V: _fem.FunctionSpace
     finalized: bool
     _cpp_object: dolfinx_mpc.cpp.mpc.MultiPointConstraint
+    _sparsity_patterns: Dict[Tuple[int, int], Tuple[_fem.FormMetaClass, Any, _cpp.la.SparsityPattern]]
     __slots__ = tuple(__annotations__)
 
     def __init__(self, V: _fem.FunctionSpace):
@@ -43,6 +44,7 @@ class MultiPointConstraint():
         self._offsets = numpy.array([0], dtype=numpy.int32)
         self.V = V
         self.finalized = False
+        self._sparsity_patterns = {}
 
     def add_constraint(self, V: _fem.FunctionSpace, slaves: npt.NDArray[numpy.int32],
                        masters: npt.NDArray[numpy.int64], coeffs: npt.NDArray[_PETSc.ScalarType],
@@ -100,6 +102,13 @@ class MultiPointConstraint():
         # Delete variables that are no longer required
         del (self._slaves, self._masters, self._coeffs, self._owners, self._offsets)
 
+    def clear_sparsity_patterns(self) -> None:
+        """
+        Remove the sparsity patterns cached by matrix creation with `reuse_sparsity=True`,
+        releasing the cached patterns and the forms and constraints they were created for.
+        """
+        self._sparsity_patterns.clear()
+
     def create_periodic_constraint_topological(self, V: _fem.FunctionSpace, meshtag: _cpp.mesh.MeshTags_int32, tag: int,
                                                relation: Callable[[numpy.ndarray], numpy.ndarray],
                                                bcs: list[_fem.DirichletBCMetaClass], scale: _PETSc.ScalarType = 1):
@@ -242,6 +251,30 @@ class MultiPointConstraint():
             self.V, slave_master_dict, subspace_slave, subspace_master)
         self.add_constraint(self.V, slaves, masters, coeffs, owners, offsets)
 
+    def create_array_constraint(self, constraint: Constraint):
+        """
+        Create a general constraint where the slave and master degrees of freedom are given by their
+        coordinates. This is the array equivalent of
+        :meth:`dolfinx_mpc.MultiPointConstraint.create_general_constraint`.
+
+        Args:
+            constraint: The slave and master coordinates, coefficients and sub spaces
+
+        Example:
+            If the dof `D` located at `[d0, d1]` should be constrained to the dofs
+            `E` and `F` at `[e0, e1]` and `[f0, f1]` as :math:`D = \\alpha E + \\beta F`
+            the input should be:
+
+            .. highlight:: python
+            .. code-block:: python
+
+                constraint = dolfinx_mpc.Constraint(numpy.array([[d0, d1]]), numpy.array([[e0, e1], [f0, f1]]),
+                                                    numpy.array([alpha, beta]), numpy.array([0, 2]))
+                mpc.create_array_constraint(constraint)
+        """
+        slaves, masters, coeffs, owners, offsets = create_array_constraint(self.V, constraint)
+        self.add_constraint(self.V, slaves, masters, coeffs, owners, offsets)
+
     def create_contact_slip_condition(self, meshtags: _cpp.mesh.MeshTags_int32, slave_marker: int, master_marker: int,
                                       normal: _fem.Function, eps2: float = 1e-20):
         """
@@ -15,5 +15,6 @@ except ModuleNotFoundError:
 
 from .assemble_matrix import assemble_matrix
 from .assemble_vector import assemble_vector
+from .backsubstitution import backsubstitution
 
-__all__ = ["assemble_matrix", "assemble_vector"]
\ No newline at end of file
+__all__ = ["assemble_matrix", "assemble_vector", "backsubstitution"]
\ No newline at end of file
@@ -13,21 +13,28 @@ import numba
 import numpy
 import numpy.typing as npt
 from dolfinx.common import Timer
-from dolfinx_mpc.assemble_matrix import create_sparsity_pattern
+from dolfinx_mpc.assemble_matrix import create_matrix
 from dolfinx_mpc.multipointconstraint import MultiPointConstraint
 from petsc4py import PETSc as _PETSc
 
-from .helpers import _bcs, _forms, extract_slave_cells, pack_slave_facet_info
+from .helpers import (_bcs, _forms, num_threads, pack_cell_masters, pack_slave_facet_info, slave_cell_mask,
+                      unroll_dofs)
 from .numba_setup import initialize_petsc, sink
 
 mode = _PETSc.InsertMode.ADD_VALUES
 insert = _PETSc.InsertMode.INSERT_VALUES
+
+# Number of cells whose element tensors are tabulated together (in parallel)
+batch_size = 64
+# Maximal number of distinct element tensors kept for translation invariant forms
+max_templates = 8
 ffi, set_values_local = initialize_petsc()
 
 
 def assemble_matrix(form: _forms, constraint: MultiPointConstraint,
                     bcs: Optional[List[_bcs]] = None, diagval: _PETSc.ScalarType = 1.,
-                    A: Optional[_PETSc.Mat] = None):
+                    A: Optional[_PETSc.Mat] = None, reuse_sparsity: bool = False,
+                    translation_invariant: bool = False):
     """
     Assembles a compiled DOLFINx form with given a multi point constraint and possible
     Dirichlet boundary conditions.
@@ -39,6 +46,17 @@ def assemble_matrix(form: _forms, constraint: MultiPointConstraint,
         bcs: List of Dirichlet boundary conditions
         diagval: Value to set on the diagonal of the matrix
         A: PETSc matrix to assemble into (optional)
+        reuse_sparsity: If `A` is not supplied, cache the sparsity pattern of the form on the
+            constraint, and reuse it when creating the matrix in subsequent calls. Each cached
+            pattern keeps its form and constraint alive until
+            :func:`dolfinx_mpc.MultiPointConstraint.clear_sparsity_patterns` is called
+        translation_invariant: If the cell integrals only depend on the cell geometry up to a
+            translation (i.e. no `ufl.SpatialCoordinate`), reuse the element tensor of a
+            previously tabulated slave cell with the same translated geometry and coefficients
+
+    NOTE: The element tensors of slave cells are computed with numba threads. With more than
+    one MPI process this is only done if `NUMBA_NUM_THREADS` is set, see
+    :func:`dolfinx_mpc.numba.helpers.num_threads`.
     """
     timer_matrix = Timer("~MPC: Assemble matrix (numba)")
 
@@ -46,15 +64,24 @@ def assemble_matrix(form: _forms, constraint: MultiPointConstraint,
     dofmap = V.dofmap
     dofs = dofmap.list.array
 
+    # General assembly data
+    block_size = dofmap.dof_layout.block_size
+    num_dofs_per_element = dofmap.dof_layout.num_dofs
+
+    unrolled_dofs = unroll_dofs(dofs, num_dofs_per_element, block_size)
+
     # Pack MPC data for numba kernels
     coefficients = constraint.coefficients()[0]
     masters_adj = constraint.masters
     c_to_s_adj = constraint.cell_to_slaves
-    cell_to_slave = c_to_s_adj.array
     c_to_s_off = c_to_s_adj.offsets
     is_slave = constraint.is_slave
-    mpc_data = (masters_adj.array, coefficients, masters_adj.offsets, cell_to_slave, c_to_s_off, is_slave)
-    slave_cells = extract_slave_cells(c_to_s_off)
+    cell_offsets, flat_slaves, flat_masters, flat_coeffs = pack_cell_masters(
+        unrolled_dofs, c_to_s_adj.array, c_to_s_off, masters_adj.array, coefficients, masters_adj.offsets)
+    max_masters = numpy.max(numpy.diff(cell_offsets), initial=0)
+    mpc_data = (cell_offsets, flat_slaves, flat_masters, flat_coeffs, is_slave)
+
+    is_slave_cell = slave_cell_mask(constraint)
 
     # Create 1D bc indicator for matrix assembly
     num_dofs_local = (dofmap.index_map.size_local + dofmap.index_map.num_ghosts) * dofmap.index_map_bs
@@ -75,18 +102,12 @@ def assemble_matrix(form: _forms, constraint: MultiPointConstraint,
 
     # Create sparsity pattern and matrix if not supplied
     if A is None:
-        pattern = create_sparsity_pattern(form, constraint)
-        pattern.assemble()
-        A = _cpp.la.petsc.create_matrix(V.mesh.comm, pattern)
+        A = create_matrix(form, (constraint, constraint), reuse_sparsity)
     A.zeroEntries()
 
     # Assemble the matrix with all entries
     _cpp.fem.petsc.assemble_matrix(A, form, form_consts, form_coeffs, bcs, False)
 
-    # General assembly data
-    block_size = dofmap.dof_layout.block_size
-    num_dofs_per_element = dofmap.dof_layout.num_dofs
-
     tdim = V.mesh.topology.dim
 
     # Assemble over cells
@@ -117,9 +138,18 @@ def assemble_matrix(form: _forms, constraint: MultiPointConstraint,
             coeffs_i = form_coeffs[(_fem.IntegralType.cell, id)]
             cell_kernel = getattr(ufcx_form.integrals(_fem.IntegralType.cell)[i], f"tabulate_tensor_{nptype}")
             active_cells = form.domains(_fem.IntegralType.cell, id)
-            assemble_slave_cells(A.handle, cell_kernel, active_cells[numpy.isin(active_cells, slave_cells)],
-                                 (pos, x_dofs, x), coeffs_i, form_consts, cell_perms, dofs,
-                                 block_size, num_dofs_per_element, mpc_data, is_bc)
+            slave_cells = active_cells[is_slave_cell[active_cells]]
+            # Gather the geometry of all slave cells at once
+            # NOTE: All cells are assumed to be of the same type
+            cell_geometry = x[x_dofs.reshape(len(pos) - 1, -1)[slave_cells]]
+            previous_threads = numba.get_num_threads()
+            numba.set_num_threads(num_threads(V.mesh.comm))
+            try:
+                assemble_slave_cells(A.handle, cell_kernel, slave_cells, cell_geometry, coeffs_i, form_consts,
+                                     cell_perms, unrolled_dofs, block_size, num_dofs_per_element, mpc_data,
+                                     max_masters, is_bc, translation_invariant)
+            finally:
+                numba.set_num_threads(previous_threads)
 
     # Assemble over exterior facets
     subdomain_ids = form.integral_ids(_fem.IntegralType.exterior_facet)
@@ -136,16 +166,16 @@ def assemble_matrix(form: _forms, constraint: MultiPointConstraint,
             facet_perms = V.mesh.topology.get_facet_permutations()
         perm = (cell_perms, form.needs_facet_permutations, facet_perms)
 
+        num_facets_per_cell = len(V.mesh.topology.connectivity(tdim, tdim - 1).links(0))
         for i, id in enumerate(subdomain_ids):
             facet_kernel = getattr(ufcx_form.integrals(_fem.IntegralType.exterior_facet)
                                    [i], f"tabulate_tensor_{nptype}")
             facets = form.domains(_fem.IntegralType.exterior_facet, id)
             coeffs_i = form_coeffs[(_fem.IntegralType.exterior_facet, id)]
-            facet_info = pack_slave_facet_info(facets, slave_cells)
-            num_facets_per_cell = len(V.mesh.topology.connectivity(tdim, tdim - 1).links(0))
+            facet_info = pack_slave_facet_info(facets, is_slave_cell)
             assemble_exterior_slave_facets(A.handle, facet_kernel, (pos, x_dofs, x), coeffs_i, form_consts,
-                                           perm, dofs, block_size, num_dofs_per_element, facet_info, mpc_data, is_bc,
-                                           num_facets_per_cell)
+                                           perm, unrolled_dofs, block_size, num_dofs_per_element, facet_info,
+                                           mpc_data, max_masters, is_bc, num_facets_per_cell)
 
     # Add mpc entries on diagonal
     slaves = constraint.slaves
@@ -164,220 +194,270 @@ def assemble_matrix(form: _forms, constraint: MultiPointConstraint,
     return A
 
 
-@numba.jit
+@numba.njit(fastmath=True, boundscheck=False)
 def add_diagonal(A: int, dofs: npt.NDArray[numpy.int32], diagval: _PETSc.ScalarType = 1):
     """
     Insert value on diagonal of matrix for given dofs.
     """
-    ffi_fb = ffi.from_buffer
     dof_list = numpy.zeros(1, dtype=numpy.int32)
     dof_value = numpy.full(1, diagval, dtype=_PETSc.ScalarType)
+    # The buffers are updated in place, so their pointers are only created once
+    p_dof, p_value = ffi.from_buffer(dof_list), ffi.from_buffer(dof_value)
     for dof in dofs:
         dof_list[0] = dof
-        ierr_loc = set_values_local(A, 1, ffi_fb(dof_list), 1, ffi_fb(dof_list), ffi_fb(dof_value), mode)
+        ierr_loc = set_values_local(A, 1, p_dof, 1, p_dof, p_value, mode)
         assert ierr_loc == 0
     sink(dof_list, dof_value)
 
 
-@numba.njit
+@numba.njit(parallel=True, fastmath=True, boundscheck=False)
 def assemble_slave_cells(A: int,
                          kernel: cffi.FFI,
                          active_cells: npt.NDArray[numpy.int32],
-                         mesh: Tuple[npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
-                                     npt.NDArray[numpy.float64]],
+                         cell_geometry: npt.NDArray[numpy.float64],
                          coeffs: npt.NDArray[_PETSc.ScalarType],
                          constants: npt.NDArray[_PETSc.ScalarType],
                          permutation_info: npt.NDArray[numpy.uint32],
-                         dofmap: npt.NDArray[numpy.int32],
+                         unrolled_dofs: npt.NDArray[numpy.int32],
                          block_size: int,
                          num_dofs_per_element: int,
-                         mpc: Tuple[npt.NDArray[numpy.int32], npt.NDArray[_PETSc.ScalarType],
-                                    npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
-                                    npt.NDArray[numpy.int32], npt.NDArray[numpy.int32]],
-                         is_bc: npt.NDArray[numpy.bool_]):
+                         mpc: Tuple[npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
+                                    npt.NDArray[numpy.int32], npt.NDArray[_PETSc.ScalarType],
+                                    npt.NDArray[numpy.int8]],
+                         max_masters: int,
+                         is_bc: npt.NDArray[numpy.bool_],
+                         translation_invariant: bool):
     """
-    Assemble MPC contributions for cell integrals
+    Assemble MPC contributions for cell integrals, where `cell_geometry` holds the coordinates
+    of the nodes of each of the `active_cells`.
+    If `translation_invariant` is set, element tensors are reused for cells whose geometry is
+    a translation of a previously tabulated cell with equal coefficients.
+    The element tensors of a batch of cells are computed in parallel, while the insertion into
+    `A` is done serially. The kernel is compiled for each combination of `block_size` and
+    `num_dofs_per_element`, such that the loops over the local dofs have constant bounds.
     """
+    # Compile a version of the kernel specialized for the element layout
+    numba.literally(block_size)
+    numba.literally(num_dofs_per_element)
     ffi_fb = ffi.from_buffer
 
-    # Get mesh and geometry data
-    pos, x_dofmap, x = mesh
-
     # Empty arrays mimicking Nullpointers
     facet_index = numpy.zeros(0, dtype=numpy.intc)
     facet_perm = numpy.zeros(0, dtype=numpy.uint8)
 
-    # NOTE: All cells are assumed to be of the same type
-    geometry = numpy.zeros((pos[1] - pos[0], 3))
-
-    A_local = numpy.zeros((block_size * num_dofs_per_element, block_size
-                           * num_dofs_per_element), dtype=_PETSc.ScalarType)
-    masters, coefficients, offsets, c_to_s, c_to_s_off, is_slave = mpc
-
-    # Loop over all cells
-    local_dofs = numpy.zeros(block_size * num_dofs_per_element, dtype=numpy.int32)
-    for cell in active_cells:
-        num_vertices = pos[cell + 1] - pos[cell]
-        geom_dofs = pos[cell]
-
-        # Compute vertices of cell from mesh data
-        geometry[:, :] = x[x_dofmap[geom_dofs:geom_dofs + num_vertices]]
-
-        # Assemble local contributions
-        A_local.fill(0.0)
-        kernel(ffi_fb(A_local), ffi_fb(coeffs[cell, :]), ffi_fb(constants), ffi_fb(geometry),
-               ffi_fb(facet_index), ffi_fb(facet_perm))
-
-        # NOTE: Here we need to apply dof transformations
-
-        # Local dof position
-        local_blocks = dofmap[num_dofs_per_element
-                              * cell: num_dofs_per_element * cell + num_dofs_per_element]
+    # Element tensors of previously tabulated cells with their translated geometry and coefficients
+    num_templates = 0
+    template_geometry = numpy.zeros((max_templates, cell_geometry.shape[1], 3))
+    template_coeffs = numpy.zeros((max_templates, coeffs.shape[1]), dtype=_PETSc.ScalarType)
+
+    # Element tensors and Dirichlet indicators for a batch of cells
+    num_local_dofs = block_size * num_dofs_per_element
+    A_batch = numpy.empty((batch_size, num_local_dofs, num_local_dofs), dtype=_PETSc.ScalarType)
+    not_bc = numpy.empty((batch_size, num_local_dofs), dtype=_PETSc.ScalarType)
+    templates = numpy.empty((max_templates, num_local_dofs, num_local_dofs), dtype=_PETSc.ScalarType)
+    cell_offsets, flat_slaves, flat_masters, flat_coeffs, is_slave = mpc
+
+    # Work arrays reused for all cells
+    A_contribution = numpy.empty((num_local_dofs, num_local_dofs), dtype=_PETSc.ScalarType)
+    scratch = allocate_scratch(num_local_dofs, max_masters)
+
+    # Template used by each cell of a batch (-1 if the cell is tabulated), and the template
+    # registered by each tabulated cell (-1 if none)
+    template_of = numpy.full(batch_size, -1, dtype=numpy.int32)
+    registers = numpy.full(batch_size, -1, dtype=numpy.int32)
+
+    # Loop over all cells in batches
+    for batch_start in range(0, len(active_cells), batch_size):
+        batch_cells = active_cells[batch_start:batch_start + batch_size]
+
+        # Match the cells against the templates, including those registered earlier in the batch
+        num_old_templates = num_templates
+        if translation_invariant:
+            for b in range(len(batch_cells)):
+                translated = cell_geometry[batch_start + b] - cell_geometry[batch_start + b, 0]
+                template_of[b] = -1
+                registers[b] = -1
+                for t in range(num_templates):
+                    if (numpy.allclose(translated, template_geometry[t], rtol=1e-12, atol=1e-14)
+                            and numpy.allclose(coeffs[batch_cells[b], :], template_coeffs[t],
+                                               rtol=1e-12, atol=1e-14)):
+                        template_of[b] = t
+                        break
+                if template_of[b] < 0 and num_templates < max_templates:
+                    template_geometry[num_templates] = translated
+                    template_coeffs[num_templates] = coeffs[batch_cells[b], :]
+                    registers[b] = num_templates
+                    num_templates += 1
+
+        # Assemble local contributions for all cells in batch
+        for b in numba.prange(len(batch_cells)):
+            cell = batch_cells[b]
+            template = template_of[b]
+            if template < 0:
+                A_batch[b] = 0.0
+                kernel(ffi.from_buffer(A_batch[b]), ffi.from_buffer(coeffs[cell, :]), ffi.from_buffer(constants),
+                       ffi.from_buffer(cell_geometry[batch_start + b]), ffi.from_buffer(facet_index),
+                       ffi.from_buffer(facet_perm))
+            elif template < num_old_templates:
+                A_batch[b] = templates[template]
+
+            # NOTE: Here we need to apply dof transformations
+
+            # Mark dofs that are not in the Dirichlet bcs
+            for j in range(num_local_dofs):
+                not_bc[b, j] = not is_bc[unrolled_dofs[cell, j]]
+
+        # Store the new templates, and copy them to the cells of the batch reusing them
+        if translation_invariant:
+            for b in range(len(batch_cells)):
+                if registers[b] >= 0:
+                    templates[registers[b]] = A_batch[b]
+            for b in range(len(batch_cells)):
+                if template_of[b] >= num_old_templates:
+                    A_batch[b] = templates[template_of[b]]
 
         # Remove all contributions for dofs that are in the Dirichlet bcs
-        for j in range(num_dofs_per_element):
-            for k in range(block_size):
-                if is_bc[local_blocks[j] * block_size + k]:
-                    A_local[j * block_size + k, :] = 0
-                    A_local[:, j * block_size + k] = 0
-
-        A_local_copy: numpy.typing.NDArray[_PETSc.ScalarType] = A_local.copy()
-
-        # Find local position of slaves
-        slaves = c_to_s[c_to_s_off[cell]: c_to_s_off[cell + 1]]
-        mpc_cell = (slaves, masters, coefficients, offsets, is_slave)
-        modify_mpc_cell(A, num_dofs_per_element, block_size, A_local, local_blocks, mpc_cell)
+        for b in numba.prange(len(batch_cells)):
+            for i in range(num_local_dofs):
+                for j in range(num_local_dofs):
+                    A_batch[b, i, j] *= not_bc[b, i] * not_bc[b, j]
 
-        # Remove already assembled contribution to matrix
-        A_contribution = A_local - A_local_copy
+        for b, cell in enumerate(batch_cells):
+            A_local = A_batch[b]
+            local_dofs = unrolled_dofs[cell]
 
-        # Expand local blocks to dofs
-        for i in range(num_dofs_per_element):
-            for j in range(block_size):
-                local_dofs[i * block_size + j] = local_blocks[i] * block_size + j
+            # Add MPC contributions, and compute the contribution removing the already
+            # assembled slave rows and columns from the matrix
+            cell_masters = slice(cell_offsets[cell], cell_offsets[cell + 1])
+            mpc_cell = (flat_slaves[cell_masters], flat_masters[cell_masters], flat_coeffs[cell_masters], is_slave)
+            modify_mpc_cell(A, block_size, num_dofs_per_element, A_local, local_dofs, mpc_cell, scratch,
+                            A_contribution)
 
-        # Insert local contribution
-        ierr_loc = set_values_local(A, block_size * num_dofs_per_element, ffi_fb(local_dofs),
-                                    block_size * num_dofs_per_element, ffi_fb(local_dofs), ffi_fb(A_contribution), mode)
-        assert ierr_loc == 0
+            # Insert local contribution
+            ierr_loc = set_values_local(A, num_local_dofs, ffi_fb(local_dofs),
+                                        num_local_dofs, ffi_fb(local_dofs), ffi_fb(A_contribution), mode)
+            assert ierr_loc == 0
 
-    sink(A_contribution, local_dofs)
+    sink(A_contribution, unrolled_dofs)
 
 
-@numba.njit
-def modify_mpc_cell(A: int, num_dofs: int, block_size: int,
-                    Ae: npt.NDArray[_PETSc.ScalarType],
-                    local_blocks: npt.NDArray[numpy.int32],
+@numba.njit(fastmath=True, boundscheck=False)
+def modify_mpc_cell(A: int, block_size: int, num_dofs_per_element: int, Ae: npt.NDArray[_PETSc.ScalarType],
+                    local_dofs: npt.NDArray[numpy.int32],
                     mpc_cell: Tuple[npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
-                                    npt.NDArray[_PETSc.ScalarType], npt.NDArray[numpy.int32],
-                                    npt.NDArray[numpy.int8]]):
+                                    npt.NDArray[_PETSc.ScalarType], npt.NDArray[numpy.int8]],
+                    scratch: Tuple[npt.NDArray[_PETSc.ScalarType], npt.NDArray[numpy.bool_],
+                                   npt.NDArray[_PETSc.ScalarType], npt.NDArray[_PETSc.ScalarType],
+                                   npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
+                                   npt.NDArray[_PETSc.ScalarType]],
+                    Ae_contribution: npt.NDArray[_PETSc.ScalarType]):
     """
-    Given an element matrix Ae, modify the contributions to respect the MPCs, and add contributions to appropriate
-    places in the global matrix A.
+    Given an element matrix Ae, add the contributions of the MPCs to appropriate places in the global matrix A.
+    The contribution removing the (already assembled) slave rows and columns of Ae is stored in
+    `Ae_contribution`. The work arrays in `scratch` are created with :func:`allocate_scratch`.
+
+    Args:
+        A: The matrix
+        block_size: The block size of the dofmap (specialized at compile time)
+        num_dofs_per_element: The number of dof blocks per cell (specialized at compile time)
+        Ae: The element matrix
+        local_dofs: The (unblocked) dofs of the cell
+        mpc_cell: For each master of the slaves in the cell (see
+            :func:`dolfinx_mpc.numba.helpers.pack_cell_masters`): the local index of the slave,
+            the master and the coefficient. The last entry is the slave indicator for all dofs.
     """
-    slaves, masters, coefficients, offsets, is_slave = mpc_cell
-
-    # Locate which local dofs are slave dofs and compute the local index of the slave
-    # Additionally count the number of masters we will needed in the flattened structures
-    local_index0 = numpy.empty(len(slaves), dtype=numpy.int32)
-    num_flattened_masters = 0
-    for i in range(num_dofs):
-        for j in range(block_size):
-            slave = local_blocks[i] * block_size + j
-            if is_slave[slave]:
-                location = numpy.flatnonzero(slaves == slave)[0]
-                local_index0[location] = i * block_size + j
-                num_flattened_masters += offsets[slave + 1] - offsets[slave]
-    # Strip a copy of Ae of all columns and rows belonging to a slave
-    Ae_original = numpy.copy(Ae)
-    Ae_stripped = numpy.zeros((block_size * num_dofs, block_size * num_dofs), dtype=_PETSc.ScalarType)
-    for i in range(num_dofs):
-        for b in range(block_size):
-            is_slave0 = is_slave[local_blocks[i] * block_size + b]
-            for j in range(num_dofs):
-                for c in range(block_size):
-                    is_slave1 = is_slave[local_blocks[j] * block_size + c]
-                    Ae_stripped[i * block_size + b, j * block_size
-                                + c] = (not (is_slave0 and is_slave1)) * Ae_original[i * block_size + b,
-                                                                                     j * block_size + c]
-    flattened_masters = numpy.zeros(num_flattened_masters, dtype=numpy.int32)
-    flattened_slaves = numpy.zeros(num_flattened_masters, dtype=numpy.int32)
-    flattened_coeffs = numpy.zeros(num_flattened_masters, dtype=_PETSc.ScalarType)
-    c = 0
-    for i, slave in enumerate(slaves):
-        local_masters = masters[offsets[slave]: offsets[slave + 1]]
-        local_coeffs = coefficients[offsets[slave]: offsets[slave + 1]]
-        num_masters = len(local_masters)
-        for j in range(num_masters):
-            flattened_slaves[c + j] = local_index0[i]
-            flattened_masters[c + j] = local_masters[j]
-            flattened_coeffs[c + j] = local_coeffs[j]
-        c += num_masters
-    m0 = numpy.zeros(1, dtype=numpy.int32)
-    m1 = numpy.zeros(1, dtype=numpy.int32)
-    Am0m1 = numpy.zeros((1, 1), dtype=_PETSc.ScalarType)
-    Arow = numpy.zeros(block_size * num_dofs, dtype=_PETSc.ScalarType)
-    Acol = numpy.zeros(block_size * num_dofs, dtype=_PETSc.ScalarType)
-    mpc_dofs = numpy.zeros(block_size * num_dofs, dtype=numpy.int32)
+    numba.literally(block_size)
+    numba.literally(num_dofs_per_element)
+    flattened_slaves, flattened_masters, flattened_coeffs, is_slave = mpc_cell
+    Ae_stripped_T, is_slave_local, Arow, Acol, mpc_dofs, m0, Amm_all = scratch
+    num_local_dofs = block_size * num_dofs_per_element
+    num_flattened_masters = len(flattened_masters)
+
+    # Store the transpose of Ae stripped of all entries coupling two slaves, such that
+    # the slave columns are contiguous
+    for i in range(num_local_dofs):
+        is_slave_local[i] = is_slave[local_dofs[i]]
+    for i in range(num_local_dofs):
+        for j in range(num_local_dofs):
+            Ae_stripped_T[j, i] = 0 if is_slave_local[i] and is_slave_local[j] else Ae[i, j]
+
+    # The work arrays are modified in place, so their pointers can be reused for all masters
     ffi_fb = ffi.from_buffer
+    p_mpc_dofs, p_m0, p_Arow, p_Acol = ffi_fb(mpc_dofs), ffi_fb(m0), ffi_fb(Arow), ffi_fb(Acol)
+    Ae_contribution.fill(0)
     for i in range(num_flattened_masters):
         local_index = flattened_slaves[i]
         master = flattened_masters[i]
         coeff = flattened_coeffs[i]
-        Ae[:, local_index] = 0
-        Ae[local_index, :] = 0
+        Ae_contribution[:, local_index] = -Ae[:, local_index]
+        Ae_contribution[local_index, :] = -Ae[local_index, :]
         m0[0] = master
-        Arow[:] = coeff * Ae_stripped[:, local_index]
-        Acol[:] = coeff * Ae_stripped[local_index, :]
-        Am0m1[0, 0] = coeff**2 * Ae_original[local_index, local_index]
-        for j in range(num_dofs):
-            for k in range(block_size):
-                mpc_dofs[j * block_size + k] = local_blocks[j] * block_size + k
+        Arow[:] = coeff * Ae_stripped_T[local_index, :]
+        for j in range(num_local_dofs):
+            Acol[j] = 0 if is_slave_local[j] else coeff * Ae[local_index, j]
+        mpc_dofs[:] = local_dofs
         mpc_dofs[local_index] = master
-        ierr_row = set_values_local(A, block_size * num_dofs, ffi_fb(mpc_dofs), 1, ffi_fb(m0), ffi_fb(Arow), mode)
+        ierr_row = set_values_local(A, num_local_dofs, p_mpc_dofs, 1, p_m0, p_Arow, mode)
         assert ierr_row == 0
 
         # Add slave row to master row
-        ierr_col = set_values_local(A, 1, ffi_fb(m0), block_size * num_dofs, ffi_fb(mpc_dofs), ffi_fb(Acol), mode)
+        ierr_col = set_values_local(A, 1, p_m0, num_local_dofs, p_mpc_dofs, p_Acol, mode)
         assert ierr_col == 0
 
-        ierr_master = set_values_local(A, 1, ffi_fb(m0), 1, ffi_fb(m0), ffi_fb(Am0m1), mode)
-        assert ierr_master == 0
-
-        # Add contributions for other masters relating to slaves on the given cell
+    # Add all master-master couplings of the slaves on the given cell as a single block
+    Amm = Amm_all[:num_flattened_masters * num_flattened_masters].reshape(num_flattened_masters,
+                                                                          num_flattened_masters)
+    for i in range(num_flattened_masters):
         for j in range(num_flattened_masters):
-            if i == j:
-                continue
-            other_local_index = flattened_slaves[j]
-            other_master = flattened_masters[j]
-            other_coeff = flattened_coeffs[j]
-            m1[0] = other_master
-            Am0m1[0, 0] = coeff * other_coeff * Ae_original[local_index, other_local_index]
-            ierr_other_masters = set_values_local(A, 1, ffi_fb(m0), 1, ffi_fb(m1), ffi_fb(Am0m1), mode)
-            assert ierr_other_masters == 0
+            Amm[i, j] = (flattened_coeffs[i] * flattened_coeffs[j]
+                         * Ae[flattened_slaves[i], flattened_slaves[j]])
+    masters_buffer = numpy.ascontiguousarray(flattened_masters)
+    ierr_masters = set_values_local(A, num_flattened_masters, ffi_fb(masters_buffer),
+                                    num_flattened_masters, ffi_fb(masters_buffer), ffi_fb(Amm), mode)
+    assert ierr_masters == 0
+
+    sink(Arow, Acol, Amm, m0, mpc_dofs, masters_buffer)
+
 
-    sink(Arow, Acol, Am0m1, m0, m1, mpc_dofs)
+@numba.njit(cache=True)
+def allocate_scratch(num_local_dofs: int, max_masters: int):
+    """
+    Allocate the work arrays used by :func:`modify_mpc_cell` for a cell with `num_local_dofs`
+    degrees of freedom, whose slaves have at most `max_masters` masters in total
+    """
+    return (numpy.empty((num_local_dofs, num_local_dofs), dtype=_PETSc.ScalarType),
+            numpy.empty(num_local_dofs, dtype=numpy.bool_),
+            numpy.empty(num_local_dofs, dtype=_PETSc.ScalarType),
+            numpy.empty(num_local_dofs, dtype=_PETSc.ScalarType),
+            numpy.empty(num_local_dofs, dtype=numpy.int32),
+            numpy.empty(1, dtype=numpy.int32),
+            numpy.empty(max_masters * max_masters, dtype=_PETSc.ScalarType))
 
 
-@numba.njit
+@numba.njit(fastmath=True, boundscheck=False)
 def assemble_exterior_slave_facets(A: int, kernel: cffi.FFI,
                                    mesh: Tuple[npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
                                                npt.NDArray[numpy.float64]],
                                    coeffs: npt.NDArray[_PETSc.ScalarType],
                                    consts: npt.NDArray[_PETSc.ScalarType],
                                    perm: npt.NDArray[numpy.uint32],
-                                   dofmap: npt.NDArray[numpy.int32],
+                                   unrolled_dofs: npt.NDArray[numpy.int32],
                                    block_size: int,
                                    num_dofs_per_element: int,
                                    facet_info: npt.NDArray[numpy.int32],
-                                   mpc: Tuple[npt.NDArray[numpy.int32], npt.NDArray[_PETSc.ScalarType],
-                                              npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
-                                              npt.NDArray[numpy.int32], npt.NDArray[numpy.int32]],
+                                   mpc: Tuple[npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
+                                              npt.NDArray[numpy.int32], npt.NDArray[_PETSc.ScalarType],
+                                              npt.NDArray[numpy.int8]],
+                                   max_masters: int,
                                    is_bc: npt.NDArray[numpy.bool_],
                                    num_facets_per_cell: int):
     """Assemble MPC contributions over exterior facet integrals"""
+    # Compile a version of the kernel specialized for the element layout
+    numba.literally(block_size)
+    numba.literally(num_dofs_per_element)
+
     # Unpack mpc data
-    masters, coefficients, offsets, c_to_s, c_to_s_off, is_slave = mpc
+    cell_offsets, flat_slaves, flat_masters, flat_coeffs, is_slave = mpc
 
     # Mesh data
     pos, x_dofmap, x = mesh
@@ -390,9 +470,10 @@ def assemble_exterior_slave_facets(A: int, kernel: cffi.FFI,
     geometry = numpy.zeros((pos[1] - pos[0], 3))
 
     # Numpy data used in facet loop
-    A_local = numpy.zeros((num_dofs_per_element * block_size,
-                           num_dofs_per_element * block_size), dtype=_PETSc.ScalarType)
-    local_dofs = numpy.zeros(block_size * num_dofs_per_element, dtype=numpy.int32)
+    num_local_dofs = num_dofs_per_element * block_size
+    A_local = numpy.zeros((num_local_dofs, num_local_dofs), dtype=_PETSc.ScalarType)
+    A_contribution = numpy.empty((num_local_dofs, num_local_dofs), dtype=_PETSc.ScalarType)
+    scratch = allocate_scratch(num_local_dofs, max_masters)
 
     # Permutation info
     cell_perms, needs_facet_perm, facet_perms = perm
@@ -415,29 +496,18 @@ def assemble_exterior_slave_facets(A: int, kernel: cffi.FFI,
                ffi.from_buffer(geometry), ffi.from_buffer(facet_index), ffi.from_buffer(facet_perm))
         # NOTE: Here we need to add the apply_dof_transformation and apply_dof_transformation transpose functions
 
-        # Extract local blocks of dofs
-        block_pos = num_dofs_per_element * cell_index
-        local_blocks = dofmap[block_pos: block_pos + num_dofs_per_element]
-
         # Remove all contributions for dofs that are in the Dirichlet bcs
-        for j in range(num_dofs_per_element):
-            for k in range(block_size):
-                if is_bc[local_blocks[j] * block_size + k]:
-                    A_local[j * block_size + k, :] = 0
-                    A_local[:, j * block_size + k] = 0
-
-        A_local_copy: numpy.typing.NDArray[_PETSc.ScalarType] = A_local.copy()
-        slaves = c_to_s[c_to_s_off[cell_index]: c_to_s_off[cell_index + 1]]
-        mpc_cell = (slaves, masters, coefficients, offsets, is_slave)
-        modify_mpc_cell(A, num_dofs_per_element, block_size, A_local, local_blocks, mpc_cell)
-
-        # Remove already assembled contribution to matrix
-        A_contribution = A_local - A_local_copy
-
-        # Expand local blocks to dofs
-        for i in range(num_dofs_per_element):
-            for j in range(block_size):
-                local_dofs[i * block_size + j] = local_blocks[i] * block_size + j
+        local_dofs = unrolled_dofs[cell_index]
+        for j, dof in enumerate(local_dofs):
+            if is_bc[dof]:
+                A_local[j, :] = 0
+                A_local[:, j] = 0
+
+        # Compute MPC contributions, and remove the already assembled slave rows and columns
+        cell_masters = slice(cell_offsets[cell_index], cell_offsets[cell_index + 1])
+        mpc_cell = (flat_slaves[cell_masters], flat_masters[cell_masters], flat_coeffs[cell_masters], is_slave)
+        modify_mpc_cell(A, block_size, num_dofs_per_element, A_local, local_dofs, mpc_cell, scratch,
+                        A_contribution)
 
         # Insert local contribution
         ierr_loc = set_values_local(A, block_size * num_dofs_per_element, ffi.from_buffer(local_dofs),
@@ -445,4 +515,4 @@ def assemble_exterior_slave_facets(A: int, kernel: cffi.FFI,
                                     ffi.from_buffer(A_contribution), mode)
         assert ierr_loc == 0
 
-    sink(A_contribution, local_dofs)
+    sink(A_contribution, unrolled_dofs)
@@ -17,7 +17,7 @@ from dolfinx.common import Timer
 from dolfinx_mpc.multipointconstraint import MultiPointConstraint
 from petsc4py import PETSc as _PETSc
 
-from .helpers import _forms, extract_slave_cells, pack_slave_facet_info
+from .helpers import _forms, pack_cell_masters, pack_slave_facet_info, slave_cell_mask, unroll_dofs
 from .numba_setup import initialize_petsc
 
 ffi, _ = initialize_petsc()
@@ -43,16 +43,19 @@ def assemble_vector(form: _forms, constraint: MultiPointConstraint, b: Optional[
     x = V.mesh.geometry.x
     dofs = V.dofmap.list().array
     block_size = V.dofmap.index_map_bs
+    num_dofs_per_element = V.dofmap.dof_layout.num_dofs
+
+    unrolled_dofs = unroll_dofs(dofs, num_dofs_per_element, block_size)
 
     # Data from multipointconstraint
     coefficients = constraint.coefficients()[0]
     masters_adj = constraint.masters
     c_to_s_adj = constraint.cell_to_slaves
-    cell_to_slave = c_to_s_adj.array
     c_to_s_off = c_to_s_adj.offsets
-    is_slave = constraint.is_slave
-    mpc_data = (masters_adj.array, coefficients, masters_adj.offsets, cell_to_slave, c_to_s_off, is_slave)
-    slave_cells = extract_slave_cells(c_to_s_off)
+    mpc_data = pack_cell_masters(unrolled_dofs, c_to_s_adj.array, c_to_s_off, masters_adj.array, coefficients,
+                                 masters_adj.offsets)
+
+    is_slave_cell = slave_cell_mask(constraint)
 
     # Get index map and ghost info
     if b is None:
@@ -66,7 +69,6 @@ def assemble_vector(form: _forms, constraint: MultiPointConstraint, b: Optional[
     form_consts = _cpp.fem.pack_constants(form)
 
     tdim = V.mesh.topology.dim
-    num_dofs_per_element = V.dofmap.dof_layout.num_dofs
 
     # Assemble vector with all entries
     with vector.localForm() as b_local:
@@ -96,7 +98,7 @@ def assemble_vector(form: _forms, constraint: MultiPointConstraint, b: Optional[
             active_cells = form.domains(_fem.IntegralType.cell, id)
             coeffs_i = form_coeffs[(_fem.IntegralType.cell, id)]
             with vector.localForm() as b:
-                assemble_cells(numpy.asarray(b), cell_kernel, active_cells[numpy.isin(active_cells, slave_cells)],
+                assemble_cells(numpy.asarray(b), cell_kernel, active_cells[is_slave_cell[active_cells]],
                                (pos, x_dofs, x), coeffs_i, form_consts,
                                cell_perms, dofs, block_size, num_dofs_per_element, mpc_data)
 
@@ -111,13 +113,13 @@ def assemble_vector(form: _forms, constraint: MultiPointConstraint, b: Optional[
         if form.needs_facet_permutations:
             facet_perms = V.mesh.topology.get_facet_permutations()
         perm = (cell_perms, form.needs_facet_permutations, facet_perms)
+        num_facets_per_cell = len(V.mesh.topology.connectivity(tdim, tdim - 1).links(0))
         for i, id in enumerate(subdomain_ids):
             facet_kernel = getattr(ufcx_form.integrals(_fem.IntegralType.exterior_facet)[i],
                                    f"tabulate_tensor_{nptype}")
             coeffs_i = form_coeffs[(_fem.IntegralType.exterior_facet, id)]
             facets = form.domains(_fem.IntegralType.exterior_facet, id)
-            facet_info = pack_slave_facet_info(facets, slave_cells)
-            num_facets_per_cell = len(V.mesh.topology.connectivity(tdim, tdim - 1).links(0))
+            facet_info = pack_slave_facet_info(facets, is_slave_cell)
             with vector.localForm() as b:
                 assemble_exterior_slave_facets(numpy.asarray(b), facet_kernel, facet_info, (pos, x_dofs, x),
                                                coeffs_i, form_consts, perm,
@@ -126,7 +128,7 @@ def assemble_vector(form: _forms, constraint: MultiPointConstraint, b: Optional[
     return vector
 
 
-@numba.njit
+@numba.njit(fastmath=True, boundscheck=False)
 def assemble_cells(b: npt.NDArray[_PETSc.ScalarType],
                    kernel: cffi.FFI, active_cells: npt.NDArray[numpy.int32],
                    mesh: Tuple[npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
@@ -137,9 +139,8 @@ def assemble_cells(b: npt.NDArray[_PETSc.ScalarType],
                    dofmap: npt.NDArray[numpy.int32],
                    block_size: int,
                    num_dofs_per_element: int,
-                   mpc: Tuple[npt.NDArray[numpy.int32], npt.NDArray[_PETSc.ScalarType],
-                              npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
-                              npt.NDArray[numpy.int32], npt.NDArray[numpy.int32]]):
+                   mpc: Tuple[npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
+                              npt.NDArray[numpy.int32], npt.NDArray[_PETSc.ScalarType]]):
     """Assemble additional MPC contributions for cell integrals"""
     ffi_fb = ffi.from_buffer
 
@@ -170,15 +171,14 @@ def assemble_cells(b: npt.NDArray[_PETSc.ScalarType],
 
         # Modify global vector and local cell contributions
         b_local_copy = b_local.copy()
-        modify_mpc_contributions(b, cell_index, b_local, b_local_copy, mpc, dofmap,
-                                 block_size, num_dofs_per_element)
+        modify_mpc_contributions(b, cell_index, b_local, b_local_copy, mpc)
         for j in range(num_dofs_per_element):
             for k in range(block_size):
                 position = dofmap[num_dofs_per_element * cell_index + j] * block_size + k
                 b[position] += (b_local[j * block_size + k] - b_local_copy[j * block_size + k])
 
 
-@numba.njit
+@numba.njit(fastmath=True, boundscheck=False)
 def assemble_exterior_slave_facets(b: npt.NDArray[_PETSc.ScalarType],
                                    kernel: cffi.FFI,
                                    facet_info: npt.NDArray[numpy.int32],
@@ -190,9 +190,8 @@ def assemble_exterior_slave_facets(b: npt.NDArray[_PETSc.ScalarType],
                                    dofmap: npt.NDArray[numpy.int32],
                                    block_size: int,
                                    num_dofs_per_element: int,
-                                   mpc: Tuple[npt.NDArray[numpy.int32], npt.NDArray[_PETSc.ScalarType],
-                                              npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
-                                              npt.NDArray[numpy.int32], npt.NDArray[numpy.int32]],
+                                   mpc: Tuple[npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
+                                              npt.NDArray[numpy.int32], npt.NDArray[_PETSc.ScalarType]],
                                    num_facets_per_cell: int):
     """Assemble additional MPC contributions for facets"""
     ffi_fb = ffi.from_buffer
@@ -227,53 +226,31 @@ def assemble_exterior_slave_facets(b: npt.NDArray[_PETSc.ScalarType],
 
         # Modify local contributions and add global MPC contributions
         b_local_copy = b_local.copy()
-        modify_mpc_contributions(b, cell_index, b_local, b_local_copy,
-                                 mpc, dofmap, block_size, num_dofs_per_element)
+        modify_mpc_contributions(b, cell_index, b_local, b_local_copy, mpc)
         for j in range(num_dofs_per_element):
             for k in range(block_size):
                 position = dofmap[num_dofs_per_element * cell_index + j] * block_size + k
                 b[position] += (b_local[j * block_size + k] - b_local_copy[j * block_size + k])
 
 
-@numba.njit(cache=True)
+@numba.njit(cache=True, fastmath=True, boundscheck=False)
 def modify_mpc_contributions(b: npt.NDArray[_PETSc.ScalarType], cell_index: int,
                              b_local: npt.NDArray[_PETSc.ScalarType],
                              b_copy: npt.NDArray[_PETSc.ScalarType],
-                             mpc: Tuple[npt.NDArray[numpy.int32], npt.NDArray[_PETSc.ScalarType],
-                                        npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
-                                        npt.NDArray[numpy.int32], npt.NDArray[numpy.int32]],
-                             dofmap: npt.NDArray[numpy.int32],
-                             block_size: int,
-                             num_dofs_per_element: int):
+                             mpc: Tuple[npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
+                                        npt.NDArray[numpy.int32], npt.NDArray[_PETSc.ScalarType]]):
     """
     Modify local entries of b_local with MPC info and add modified
-    entries to global vector b.
+    entries to global vector b. The MPC data is packed per cell, see
+    :func:`dolfinx_mpc.numba.helpers.pack_cell_masters`.
     """
 
     # Unwrap MPC data
-    masters, coefficients, offsets, cell_to_slave, cell_to_slave_offset, is_slave = mpc
-
-    # Determine which slaves are in this cell,
-    # and which global index they have in 1D arrays
-    cell_slaves = cell_to_slave[cell_to_slave_offset[cell_index]:
-                                cell_to_slave_offset[cell_index + 1]]
-
-    # Get local index of slaves in cell
-    cell_blocks = dofmap[num_dofs_per_element * cell_index:
-                         num_dofs_per_element * cell_index + num_dofs_per_element]
-    local_index = numpy.empty(len(cell_slaves), dtype=numpy.int32)
-    for i in range(num_dofs_per_element):
-        for j in range(block_size):
-            dof = cell_blocks[i] * block_size + j
-            if is_slave[dof]:
-                location = numpy.flatnonzero(cell_slaves == dof)[0]
-                local_index[location] = i * block_size + j
-
-    # Move contribution from each slave to the corresponding master dof
+    cell_offsets, flattened_slaves, flattened_masters, flattened_coeffs = mpc
+
+    # Move contribution from each slave in the cell to the corresponding master dof
     # and zero out local b
-    for local, slave in zip(local_index, cell_slaves):
-        cell_masters = masters[offsets[slave]: offsets[slave + 1]]
-        cell_coeffs = coefficients[offsets[slave]: offsets[slave + 1]]
-        for m0, c0 in zip(cell_masters, cell_coeffs):
-            b[m0] += c0 * b_copy[local]
-            b_local[local] = 0
+    for k in range(cell_offsets[cell_index], cell_offsets[cell_index + 1]):
+        local = flattened_slaves[k]
+        b[flattened_masters[k]] += flattened_coeffs[k] * b_copy[local]
+        b_local[local] = 0
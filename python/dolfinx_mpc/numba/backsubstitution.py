@@ -0,0 +1,52 @@
+# Copyright (C) 2022 Jørgen S. Dokken
+#
+# This file is part of DOLFINX_MPC
+#
+# SPDX-License-Identifier:    MIT
+
+import numba
+import numpy
+import numpy.typing as npt
+from dolfinx.common import Timer
+from dolfinx_mpc.multipointconstraint import MultiPointConstraint
+from petsc4py import PETSc as _PETSc
+
+_scalar = numba.from_dtype(_PETSc.ScalarType)
+
+
+def backsubstitution(constraint: MultiPointConstraint, vector: _PETSc.Vec) -> _PETSc.Vec:
+    """
+    For a vector, impose the multi-point constraint by backsubstiution.
+    This function is used after solving the reduced problem to obtain the values
+    at the slave degrees of freedom.
+
+    Args:
+        constraint: The multi point constraint
+        vector: The input vector
+
+    Returns:
+        The input vector with updated values at the slave degrees of freedom
+    """
+    timer = Timer("~MPC: Backsubstitution (numba)")
+    masters = constraint.masters
+    coefficients = constraint.coefficients()[0]
+    with vector.localForm() as vector_local:
+        backsubstitute(vector_local.array_w, constraint.slaves, masters.array, coefficients, masters.offsets)
+    vector.ghostUpdate(addv=_PETSc.InsertMode.INSERT, mode=_PETSc.ScatterMode.FORWARD)
+    timer.stop()
+    return vector
+
+
+@numba.njit(numba.void(_scalar[:], numba.int32[:], numba.int32[:], _scalar[:], numba.int32[:]),
+            fastmath=True, cache=True)
+def backsubstitute(x: npt.NDArray[_PETSc.ScalarType], slaves: npt.NDArray[numpy.int32],
+                   masters: npt.NDArray[numpy.int32], coefficients: npt.NDArray[_PETSc.ScalarType],
+                   offsets: npt.NDArray[numpy.int32]):
+    """
+    Add the master contributions to each slave of a local vector (including ghosts).
+    The slaves are updated in order, as in the C++ implementation, such that the result is
+    well defined if a master is also a slave.
+    """
+    for slave in slaves:
+        for k in range(offsets[slave], offsets[slave + 1]):
+            x[slave] += coefficients[k] * x[masters[k]]
@@ -4,41 +4,104 @@
 #
 # SPDX-License-Identifier:    MIT
 
+import os
 import numba
 import numpy
 import numpy.typing as npt
-from typing import Union
+from typing import Tuple, Union
 import dolfinx.cpp as _cpp
+from dolfinx_mpc.multipointconstraint import MultiPointConstraint
+from mpi4py import MPI as _MPI
 
 _forms = Union[_cpp.fem.Form_float32, _cpp.fem.Form_float64, _cpp.fem.Form_complex128]
 _bcs = Union[_cpp.fem.DirichletBC_float32, _cpp.fem.DirichletBC_float64,
              _cpp.fem.DirichletBC_complex64, _cpp.fem.DirichletBC_complex128]
 
 
-@numba.njit(fastmath=True, cache=True)
-def extract_slave_cells(cell_offset: npt.NDArray[numpy.int32]) -> npt.NDArray[numpy.int32]:
-    """ From an offset determine which entries are nonzero"""
-    slave_cells = numpy.zeros(len(cell_offset) - 1, dtype=numpy.int32)
-    c = 0
-    for cell in range(len(cell_offset) - 1):
-        num_cells = cell_offset[cell + 1] - cell_offset[cell]
-        if num_cells > 0:
-            slave_cells[c] = cell
-            c += 1
-    return slave_cells[:c]
+def num_threads(comm: _MPI.Comm) -> int:
+    """
+    Number of threads used by the parallel numba kernels. When running with more than one
+    MPI process, the kernels are serial unless the number of threads is set explicitly
+    through the `NUMBA_NUM_THREADS` environment variable, as one process is usually
+    started per core.
+    """
+    if comm.size > 1 and "NUMBA_NUM_THREADS" not in os.environ:
+        return 1
+    return numba.config.NUMBA_NUM_THREADS
 
 
-@numba.njit(fastmath=True, cache=True)
+@numba.njit(numba.int32[:, :](numba.int32[:, :], numba.boolean[:]), fastmath=True, cache=True)
 def pack_slave_facet_info(facets: npt.NDArray[numpy.int32],
-                          slave_cells: npt.NDArray[numpy.int32]) -> npt.NDArray[numpy.int32]:
+                          is_slave_cell: npt.NDArray[numpy.bool_]) -> npt.NDArray[numpy.int32]:
     """
-    Given an MPC and a set of facets (cell index, local_facet_index),
+    Given an indicator of the cells containing slaves and a set of facets (cell index, local_facet_index),
     compress the set to those that only contain slave cells
     """
     facet_info = numpy.zeros((len(facets), 2), dtype=numpy.int32)
     i = 0
     for facet in facets:
-        if sum(slave_cells == facet[0]) > 0:
+        if is_slave_cell[facet[0]]:
             facet_info[i, :] = [facet[0], facet[1]]
             i += 1
     return facet_info[:i, :]
+
+
+def unroll_dofs(dofs: npt.NDArray[numpy.int32], num_dofs_per_element: int,
+                block_size: int) -> npt.NDArray[numpy.int32]:
+    """
+    Unroll a blocked dofmap to the (unblocked) dofs of each cell, returned with shape
+    `(num_cells, num_dofs_per_element * block_size)`
+    """
+    return (dofs.reshape(-1, num_dofs_per_element, 1) * block_size
+            + numpy.arange(block_size, dtype=numpy.int32)).reshape(-1, num_dofs_per_element * block_size)
+
+
+def slave_cell_mask(constraint: MultiPointConstraint) -> npt.NDArray[numpy.bool_]:
+    """
+    Indicator of the (owned and ghost) cells containing slaves. The cell to slave map of the
+    constraint only covers owned cells, while integration domains can contain ghost cells.
+    """
+    cell_map = constraint.function_space.mesh.topology.index_map(constraint.function_space.mesh.topology.dim)
+    c_to_s_off = constraint.cell_to_slaves.offsets
+    is_slave_cell = numpy.zeros(cell_map.size_local + cell_map.num_ghosts, dtype=numpy.bool_)
+    is_slave_cell[:len(c_to_s_off) - 1] = numpy.diff(c_to_s_off) > 0
+    return is_slave_cell
+
+
+def pack_cell_masters(unrolled_dofs: npt.NDArray[numpy.int32], cell_to_slave: npt.NDArray[numpy.int32],
+                      cell_to_slave_offsets: npt.NDArray[numpy.int32], masters: npt.NDArray[numpy.int32],
+                      coefficients: npt.NDArray[numpy.generic], offsets: npt.NDArray[numpy.int32]
+                      ) -> Tuple[npt.NDArray[numpy.int32], npt.NDArray[numpy.int32],
+                                 npt.NDArray[numpy.int32], npt.NDArray[numpy.generic]]:
+    """
+    Pack the masters of all slaves in each cell as a CSR structure over the cells.
+
+    Args:
+        unrolled_dofs: The (unblocked) dofs of each cell, shape `(num_cells, num_dofs_per_cell)`
+        cell_to_slave: The slaves in each cell
+        cell_to_slave_offsets: Offsets of `cell_to_slave` for each cell
+        masters: The masters of each slave
+        coefficients: The coefficient of each master
+        offsets: Offsets of `masters` and `coefficients` for each slave
+
+    Returns:
+        The offsets for each cell into the flattened arrays, and for each flattened master the
+        local index of its slave in the cell, the master and its coefficient.
+    """
+    num_slaves_per_cell = numpy.diff(cell_to_slave_offsets)
+    cells = numpy.repeat(numpy.arange(len(num_slaves_per_cell), dtype=numpy.int32), num_slaves_per_cell)
+
+    # Position of each slave in the dofs of its cell
+    local_index = numpy.argmax(unrolled_dofs[cells] == cell_to_slave[:, None], axis=1).astype(numpy.int32)
+
+    # Gather the masters of each (cell, slave) pair
+    num_masters = offsets[cell_to_slave + 1] - offsets[cell_to_slave]
+    pair_offsets = numpy.cumsum(num_masters) - num_masters
+    flat_index = (numpy.repeat(offsets[cell_to_slave] - pair_offsets, num_masters)
+                  + numpy.arange(numpy.sum(num_masters), dtype=numpy.int32))
+
+    cell_offsets = numpy.zeros(len(num_slaves_per_cell) + 1, dtype=numpy.int32)
+    cell_offsets[1:] = numpy.cumsum(numpy.bincount(cells, weights=num_masters,
+                                                   minlength=len(num_slaves_per_cell)))
+    return (cell_offsets, numpy.repeat(local_index, num_masters), masters[flat_index],
+            coefficients[flat_index])
@@ -119,20 +119,24 @@ class LinearProblem(_fem.petsc.LinearProblem):
         Returns:
             Function containing the solution"""
 
+        # Assemble rhs
+        with self._b.localForm() as b_loc:
+            b_loc.set(0)
+        assemble_vector(self._L, self._mpc, b=self._b)
+
+        # Apply lifting to the rhs and start accumulating ghost contributions,
+        # which is overlapped with the matrix assembly
+        apply_lifting(self._b, [self._a], [self.bcs], self._mpc)
+        self._b.ghostUpdateBegin(addv=PETSc.InsertMode.ADD, mode=PETSc.ScatterMode.REVERSE)
+
         # Assemble lhs
         self._A.zeroEntries()
         assemble_matrix(self._a, self._mpc, bcs=self.bcs, A=self._A)
         self._A.assemble()
         assert self._A.assembled
 
-        # Assemble rhs
-        with self._b.localForm() as b_loc:
-            b_loc.set(0)
-        assemble_vector(self._L, self._mpc, b=self._b)
-
         # Apply boundary conditions to the rhs
-        apply_lifting(self._b, [self._a], [self.bcs], self._mpc)
-        self._b.ghostUpdate(addv=PETSc.InsertMode.ADD, mode=PETSc.ScatterMode.REVERSE)
+        self._b.ghostUpdateEnd(addv=PETSc.InsertMode.ADD, mode=PETSc.ScatterMode.REVERSE)
         _fem.petsc.set_bc(self._b, self.bcs)
 
         # Solve linear system and update ghost values in the solution
@@ -7,6 +7,8 @@
 __all__ = ["gather_PETScVector", "gather_PETScMatrix", "compare_mpc_lhs", "compare_mpc_rhs",
            "gather_transformation_matrix", "compare_CSR"]
 
+from typing import Union
+
 import pytest
 import numpy as np
 from mpi4py import MPI
@@ -106,47 +108,44 @@ def gather_transformation_matrix(constraint, root=0):
         glob_slaves = imap.local_to_global(local_blocks) * block_size + local_rems
     else:
         glob_slaves = np.array([], dtype=np.int64)
-    all_slaves = np.hstack(MPI.COMM_WORLD.allgather(glob_slaves))
+    all_slaves = np.sort(np.hstack(MPI.COMM_WORLD.allgather(glob_slaves)))
     masters = constraint.masters.array
     master_blocks = masters // block_size
     master_rems = masters % block_size
     coeffs = constraint.coefficients()[0]
     offsets = constraint.masters.offsets
-    # Create sparse K matrix
-    K_val, rows, cols = [], [], []
-
     # Add local contributions to K from local slaves
-    for slave, global_slave in zip(slaves, glob_slaves):
-        masters_index = (imap.local_to_global(master_blocks[offsets[slave]: offsets[slave + 1]])
-                         * block_size + master_rems[offsets[slave]: offsets[slave + 1]])
-        coeffs_index = coeffs[offsets[slave]: offsets[slave + 1]]
-        # If we have a simply equality constraint (dirichletbc)
-        if len(masters_index) > 0:
-            for master, coeff in zip(masters_index, coeffs_index):
-                count = sum(master > all_slaves)
-                K_val.append(coeff)
-                rows.append(global_slave)
-                cols.append(master - count)
-        else:
-            K_val.append(1)
-            count = sum(global_slave > all_slaves)
-            rows.append(global_slave)
-            cols.append(global_slave - count)
+    num_masters = offsets[slaves + 1] - offsets[slaves]
+    master_index = (np.repeat(offsets[slaves] - np.cumsum(num_masters) + num_masters, num_masters)
+                    + np.arange(np.sum(num_masters)))
+    if len(master_index) > 0:
+        glob_masters = (imap.local_to_global(master_blocks[master_index]) * block_size
+                        + master_rems[master_index])
+    else:
+        glob_masters = np.array([], dtype=np.int64)
+    # If we have a simply equality constraint (dirichletbc) the slave is kept on the diagonal
+    no_masters = glob_slaves[num_masters == 0]
+    K_val = np.hstack([coeffs[master_index], np.ones(len(no_masters), dtype=PETSc.ScalarType)])
+    rows = np.hstack([np.repeat(glob_slaves, num_masters), no_masters])
+    # Each column is shifted by the number of (global) slaves preceding it
+    cols = np.hstack([glob_masters - np.searchsorted(all_slaves, glob_masters),
+                      no_masters - np.searchsorted(all_slaves, no_masters)])
 
     # Add identity for all dofs on diagonal
     l_range = V.dofmap.index_map.local_range
     global_dofs = np.arange(l_range[0] * block_size, l_range[1] * block_size)
-    is_slave = np.isin(global_dofs, glob_slaves)
-    for i, dof in enumerate(global_dofs):
-        if not is_slave[i]:
-            K_val.append(1)
-            rows.append(dof)
-            cols.append(dof - sum(dof > all_slaves))
+    is_slave = np.zeros(len(global_dofs), dtype=np.bool_)
+    is_slave[glob_slaves - l_range[0] * block_size] = True
+    free_dofs = global_dofs[~is_slave]
+    free_cols = free_dofs - np.searchsorted(all_slaves, free_dofs)
 
     # Gather K to root
-    K_vals = MPI.COMM_WORLD.gather(np.asarray(K_val, dtype=PETSc.ScalarType), root=root)
-    rows_g = MPI.COMM_WORLD.gather(np.asarray(rows, dtype=np.int64), root=root)
-    cols_g = MPI.COMM_WORLD.gather(np.asarray(cols, dtype=np.int64), root=root)
+    K_vals = MPI.COMM_WORLD.gather(np.hstack([np.asarray(K_val, dtype=PETSc.ScalarType),
+                                              np.ones(len(free_dofs), dtype=PETSc.ScalarType)]), root=root)
+    rows_g = MPI.COMM_WORLD.gather(np.hstack([np.asarray(rows, dtype=np.int64),
+                                              free_dofs.astype(np.int64)]), root=root)
+    cols_g = MPI.COMM_WORLD.gather(np.hstack([np.asarray(cols, dtype=np.int64),
+                                              free_cols.astype(np.int64)]), root=root)
 
     if MPI.COMM_WORLD.rank == root:
         K_sparse = scipy.sparse.coo_matrix((np.hstack(K_vals), (np.hstack(rows_g), np.hstack(cols_g)))).tocsr()
@@ -171,17 +170,29 @@ def gather_PETScMatrix(A: PETSc.Mat, root=0) -> scipy.sparse.csr_matrix:
     Given a distributed PETSc matrix, gather in on process 'root' in
     a scipy CSR matrix
     """
+    comm = MPI.COMM_WORLD
     ai, aj, av = A.getValuesCSR()
-    aj_all = MPI.COMM_WORLD.gather(aj, root=root)  # type: ignore
-    av_all = MPI.COMM_WORLD.gather(av, root=root)  # type: ignore
-    ai_all = MPI.COMM_WORLD.gather(ai, root=root)  # type: ignore
-    if MPI.COMM_WORLD.rank == root:
-        ai_cum = [0]
-        for ai in ai_all:  # type: ignore
-            offsets = ai[1:] + ai_cum[-1]
-            ai_cum.extend(offsets)
-        return scipy.sparse.csr_matrix(
-            (np.hstack(av_all), np.hstack(aj_all), ai_cum), shape=A.getSize())  # type: ignore
+    # Gather the local sizes once, then move each CSR array with a single
+    # buffer based collective
+    sizes = comm.gather((len(ai) - 1, len(aj)), root=root)
+    if comm.rank == root:
+        num_rows, num_nnz = np.asarray(sizes, dtype=np.int64).T  # type: ignore
+        ai_all = np.empty(np.sum(num_rows), dtype=ai.dtype)
+        aj_all = np.empty(np.sum(num_nnz), dtype=aj.dtype)
+        av_all = np.empty(np.sum(num_nnz), dtype=av.dtype)
+        comm.Gatherv(ai[1:], (ai_all, num_rows), root=root)
+        comm.Gatherv(aj, (aj_all, num_nnz), root=root)
+        comm.Gatherv(av, (av_all, num_nnz), root=root)
+        # Shift local row pointers by the number of non-zeros on preceding processes
+        nnz_offsets = np.zeros(len(num_nnz), dtype=np.int64)
+        np.cumsum(num_nnz[:-1], out=nnz_offsets[1:])
+        indptr = np.zeros(len(ai_all) + 1, dtype=np.int64)
+        indptr[1:] = ai_all + np.repeat(nnz_offsets, num_rows)
+        return scipy.sparse.csr_matrix((av_all, aj_all, indptr), shape=A.getSize())
+    else:
+        comm.Gatherv(ai[1:], None, root=root)
+        comm.Gatherv(aj, None, root=root)
+        comm.Gatherv(av, None, root=root)
 
 
 def gather_PETScVector(vector: PETSc.Vec, root=0) -> np.ndarray:
@@ -189,17 +200,28 @@ def gather_PETScVector(vector: PETSc.Vec, root=0) -> np.ndarray:
     Gather a PETScVector from different processors on
     process 'root' as an numpy array
     """
-    numpy_vec = np.zeros(vector.size, dtype=vector.array.dtype)
-    l_min = vector.owner_range[0]
-    l_max = vector.owner_range[1]
-    numpy_vec[l_min: l_max] += vector.array
-    return np.asarray(sum(MPI.COMM_WORLD.allgather(numpy_vec)))
+    comm = MPI.COMM_WORLD
+    # Only the owned entries are communicated, ordered by the ownership ranges
+    ranges = np.asarray(vector.getOwnershipRanges(), dtype=np.int64)
+    numpy_vec = np.empty(vector.size, dtype=vector.array.dtype)
+    comm.Allgatherv(vector.array, (numpy_vec, np.diff(ranges)))
+    return numpy_vec
 
 
-def compare_CSR(A: scipy.sparse.csr_matrix, B: scipy.sparse.csr_matrix, atol=1e-10):
-    """ Compare CSR matrices A and B """
-    diff = np.abs(A - B)
-    assert diff.max() < atol
+def compare_CSR(A: Union[scipy.sparse.spmatrix, np.ndarray], B: Union[scipy.sparse.spmatrix, np.ndarray],
+                atol=1e-10):
+    """
+    Compare matrices A and B. If both are sparse, only the stored entries of
+    the difference are traversed, otherwise the dense difference is compared.
+    """
+    if scipy.sparse.issparse(A) and scipy.sparse.issparse(B):
+        diff = scipy.sparse.csr_matrix(A - B)
+        diff.sum_duplicates()
+        assert np.max(np.abs(diff.data), initial=0) < atol
+    else:
+        A_dense = A.toarray() if scipy.sparse.issparse(A) else np.asarray(A)
+        B_dense = B.toarray() if scipy.sparse.issparse(B) else np.asarray(B)
+        assert np.max(np.abs(A_dense - B_dense), initial=0) < atol
 
 
 def compare_mpc_lhs(A_org: PETSc.Mat, A_mpc: PETSc.Mat,
@@ -222,12 +244,12 @@ def compare_mpc_lhs(A_org: PETSc.Mat, A_mpc: PETSc.Mat,
     glob_slaves = _gather_slaves_global(mpc)
     A_mpc_csr = gather_PETScMatrix(A_mpc, root=root)
     if MPI.COMM_WORLD.rank == root:
-        KTAK = np.conj(K.T) * A_csr * K
+        KTAK = np.conj(K.T) @ A_csr @ K
 
         # Remove identity rows of MPC matrix
-        all_cols = np.arange(V.dofmap.index_map.size_global * V.dofmap.index_map_bs)
-
-        cols_except_slaves = np.flatnonzero(np.isin(all_cols, glob_slaves, invert=True).astype(np.int32))
+        is_free = np.ones(V.dofmap.index_map.size_global * V.dofmap.index_map_bs, dtype=np.bool_)
+        is_free[glob_slaves] = False
+        cols_except_slaves = np.flatnonzero(is_free)
         mpc_without_slaves = A_mpc_csr[cols_except_slaves[:, None], cols_except_slaves]
 
         # Compute difference
@@ -248,7 +270,7 @@ def compare_mpc_rhs(b_org: PETSc.Vec, b: PETSc.Vec, constraint: dolfinx_mpc.Mult
     comm = constraint.V.mesh.comm
     if comm.rank == root:
         reduced_b = np.conj(K.T) @ b_org_np  # - constants for RHS mpc
-        all_cols = np.arange(constraint.V.dofmap.index_map.size_global * constraint.V.dofmap.index_map_bs)
-        cols_except_slaves = np.flatnonzero(np.isin(all_cols, glob_slaves, invert=True).astype(np.int32))
-        assert np.allclose(b_np[glob_slaves], 0)
-        assert np.allclose(b_np[cols_except_slaves], reduced_b)
+        is_free = np.ones(len(b_np), dtype=np.bool_)
+        is_free[glob_slaves] = False
+        assert np.allclose(b_np[~is_free], 0)
+        assert np.allclose(b_np[is_free], reduced_b)
@@ -0,0 +1,40 @@
+# Copyright (C) 2022 Jørgen S. Dokken
+#
+# This file is part of DOLFINX_MPC
+#
+# SPDX-License-Identifier:    MIT
+
+import dolfinx.fem as fem
+import dolfinx_mpc
+import numpy as np
+import pytest
+from dolfinx.mesh import CellType, create_unit_square
+from mpi4py import MPI
+
+
+@pytest.mark.parametrize("celltype", [CellType.quadrilateral, CellType.triangle])
+def test_numba_backsubstitution(celltype):
+    try:
+        from dolfinx_mpc.numba import backsubstitution
+    except ModuleNotFoundError:
+        pytest.skip("Numba not installed")
+
+    mesh = create_unit_square(MPI.COMM_WORLD, 5, 3, celltype)
+    V = fem.VectorFunctionSpace(mesh, ("Lagrange", 2))
+
+    slave_coords = np.array([[1, 0], [0, 0]], dtype=np.float64)
+    master_coords = np.array([[0, 1], [1, 1], [1, 1]], dtype=np.float64)
+    coeffs = np.array([0.43, 0.11, 0.69])
+    offsets = np.array([0, 2, 3], dtype=np.int32)
+    mpc = dolfinx_mpc.MultiPointConstraint(V)
+    mpc.create_array_constraint(dolfinx_mpc.Constraint(slave_coords, master_coords, coeffs, offsets, 1, 0))
+    mpc.finalize()
+
+    u = fem.Function(mpc.function_space)
+    u.x.array[:] = np.random.rand(len(u.x.array))
+    u.x.scatter_forward()
+    u_numba = u.copy()
+
+    mpc.backsubstitution(u.vector)
+    backsubstitution(mpc, u_numba.vector)
+    assert np.allclose(u.x.array, u_numba.x.array)
@@ -92,3 +92,155 @@ def test_slave_on_same_cell(master_point, degree, celltype, get_assemblers):  #
         dolfinx_mpc.utils.compare_mpc_lhs(A_org, A_mpc, mpc)
 
     list_timings(mesh.comm, [TimingType.wall])
+
+
+@pytest.mark.parametrize("get_assemblers", ["C++", "numba"], indirect=True)
+def test_reuse_sparsity(get_assemblers):  # noqa: F811
+    assemble_matrix, _ = get_assemblers
+
+    mesh = create_unit_square(MPI.COMM_WORLD, 5, 3)
+    V = fem.FunctionSpace(mesh, ("Lagrange", 2))
+    u = ufl.TrialFunction(V)
+    v = ufl.TestFunction(V)
+    bilinear_form = fem.form(ufl.inner(ufl.grad(u), ufl.grad(v)) * ufl.dx)
+
+    mpc = dolfinx_mpc.MultiPointConstraint(V)
+    mpc.create_array_constraint(dolfinx_mpc.Constraint(np.array([[1, 0]]), np.array([[0, 1], [1, 1]]),
+                                                       np.array([0.43, 0.11]), np.array([0, 2])))
+    mpc.finalize()
+
+    A_ref = assemble_matrix(bilinear_form, mpc)
+    assert len(mpc._sparsity_patterns) == 0
+    patterns = []
+    for _ in range(2):
+        A = assemble_matrix(bilinear_form, mpc, reuse_sparsity=True)
+        A.axpy(-1, A_ref)
+        assert np.isclose(A.norm(), 0)
+
+        # The pattern is created once, and reused in the second call
+        assert len(mpc._sparsity_patterns) == 1
+        patterns.append(list(mpc._sparsity_patterns.values())[0][2])
+    assert patterns[0] is patterns[1]
+
+    mpc.clear_sparsity_patterns()
+    assert len(mpc._sparsity_patterns) == 0
+
+
+@pytest.mark.parametrize("get_assemblers", ["numba"], indirect=True)
+@pytest.mark.parametrize("celltype", [CellType.quadrilateral, CellType.triangle])
+def test_translation_invariant_numba(celltype, get_assemblers):  # noqa: F811
+    assemble_matrix, _ = get_assemblers
+    from dolfinx_mpc.numba.assemble_matrix import max_templates
+
+    mesh = create_unit_square(MPI.COMM_WORLD, 8, 8, celltype)
+    V = fem.FunctionSpace(mesh, ("Lagrange", 2))
+    u = ufl.TrialFunction(V)
+    v = ufl.TestFunction(V)
+
+    # Constrain the whole right boundary, such that the slave cells are translations of each other
+    def periodic_boundary(x):
+        return np.isclose(x[0], 1)
+
+    def periodic_relation(x):
+        out_x = np.copy(x)
+        out_x[0] = 1 - x[0]
+        return out_x
+
+    mpc = dolfinx_mpc.MultiPointConstraint(V)
+    mpc.create_periodic_constraint_geometrical(V, periodic_boundary, periodic_relation, [])
+    mpc.finalize()
+
+    bilinear_form = fem.form(ufl.inner(ufl.grad(u), ufl.grad(v)) * ufl.dx)
+    A_ref = assemble_matrix(bilinear_form, mpc)
+    A = assemble_matrix(bilinear_form, mpc, translation_invariant=True)
+    A.axpy(-1, A_ref)
+    assert np.isclose(A.norm(), 0)
+
+    # For a form depending on the position of the cell, each slave cell gets the element tensor
+    # of the first slave cell it is a translation of (its reference cell). This is equivalent to
+    # shifting the coordinate by the translation of the slave cell relative to its reference cell.
+    Q = fem.FunctionSpace(mesh, ("DG", 0))
+    shift = fem.Function(Q)
+    references = []
+    for cell in np.flatnonzero(np.diff(mpc.cell_to_slaves.offsets)):
+        geometry = mesh.geometry.x[mesh.geometry.dofmap.links(cell)]
+        for reference in references:
+            if np.allclose(geometry - geometry[0], reference - reference[0], rtol=1e-12, atol=1e-14):
+                shift.x.array[Q.dofmap.cell_dofs(cell)[0]] = geometry[0, 1] - reference[0, 1]
+                break
+        else:
+            if len(references) < max_templates:
+                references.append(geometry)
+    shift.x.scatter_forward()
+
+    x = ufl.SpatialCoordinate(mesh)
+    position_form = fem.form(x[1] * ufl.inner(u, v) * ufl.dx)
+    A = assemble_matrix(position_form, mpc, translation_invariant=True)
+    A_ref = assemble_matrix(position_form, mpc)
+    A_shifted = assemble_matrix(fem.form((x[1] - shift) * ufl.inner(u, v) * ufl.dx), mpc)
+
+    # Element tensors are reused, and equal those of the reference cells
+    A_ref.axpy(-1, A)
+    assert not np.isclose(A_ref.norm(), 0)
+    A_shifted.axpy(-1, A)
+    assert np.isclose(A_shifted.norm(), 0)
+
+
+@pytest.mark.parametrize("get_assemblers", ["C++", "numba"], indirect=True)
+def test_block_matrix(get_assemblers):  # noqa: F811
+    assemble_matrix, _ = get_assemblers
+
+    mesh = create_unit_square(MPI.COMM_WORLD, 5, 3)
+    V = fem.VectorFunctionSpace(mesh, ("Lagrange", 1))
+    u = ufl.TrialFunction(V)
+    v = ufl.TestFunction(V)
+    bilinear_form = fem.form(ufl.inner(ufl.grad(u), ufl.grad(v)) * ufl.dx)
+
+    mpc = dolfinx_mpc.MultiPointConstraint(V)
+    mpc.create_array_constraint(dolfinx_mpc.Constraint(np.array([[1, 0]]), np.array([[1, 1]]), np.array([0.9]),
+                                                       np.array([0, 1]), 1, 1))
+    mpc.finalize()
+
+    A_ref = assemble_matrix(bilinear_form, mpc)
+    A = dolfinx_mpc.create_matrix(bilinear_form, (mpc, mpc), mat_type="baij")
+    assert A.getType() == "mpibaij" or A.getType() == "seqbaij"
+    assert A.getBlockSize() == V.dofmap.index_map_bs
+    assemble_matrix(bilinear_form, mpc, A=A)
+    A_aij = A.convert("aij")
+    A_aij.axpy(-1, A_ref)
+    assert np.isclose(A_aij.norm(), 0)
+
+
+@pytest.mark.parametrize("slave_coords, master_coords, coeffs, offsets",
+                         [([[1, 0]], [[0, 1], [1, 1]], [0.43, 0.11], [0, 1, 2]),
+                          ([[1, 0]], [[0, 1], [1, 1]], [0.43], [0, 2]),
+                          ([[1, 0, 0, 0]], [[0, 1, 0, 0]], [0.43], [0, 1])])
+def test_invalid_constraint(slave_coords, master_coords, coeffs, offsets):
+    with pytest.raises(ValueError):
+        dolfinx_mpc.Constraint(slave_coords, master_coords, coeffs, offsets)
+
+
+@pytest.mark.parametrize("celltype", [CellType.quadrilateral, CellType.triangle])
+def test_dictionary_and_array_constraint(celltype):
+    mesh = create_unit_square(MPI.COMM_WORLD, 5, 3, celltype)
+    V = fem.VectorFunctionSpace(mesh, ("Lagrange", 2))
+
+    def l2b(li):
+        return np.array(li, dtype=np.float64).tobytes()
+    s_m_c = {l2b([1, 0]): {l2b([0, 1]): 0.43, l2b([1, 1]): 0.11},
+             l2b([0, 0]): {l2b([1, 1]): 0.69}}
+    mpc_dict = dolfinx_mpc.MultiPointConstraint(V)
+    mpc_dict.create_general_constraint(s_m_c, 1, 0)
+    mpc_dict.finalize()
+
+    mpc_array = dolfinx_mpc.MultiPointConstraint(V)
+    mpc_array.create_array_constraint(dolfinx_mpc.Constraint(np.array([[1, 0], [0, 0]]),
+                                                             np.array([[0, 1], [1, 1], [1, 1]]),
+                                                             np.array([0.43, 0.11, 0.69]),
+                                                             np.array([0, 2, 3]), 1, 0))
+    mpc_array.finalize()
+
+    assert np.array_equal(mpc_dict.slaves, mpc_array.slaves)
+    assert np.array_equal(mpc_dict.masters.offsets, mpc_array.masters.offsets)
+    assert np.array_equal(mpc_dict.masters.array, mpc_array.masters.array)
+    assert np.array_equal(mpc_dict.coefficients()[0], mpc_array.coefficients()[0])